@@ -1,16 +1,108 @@
 """
 Automated Software Pipeline - AI-driven workflow orchestration
 """
+import logging
+import os
+import weakref
+
 import structlog
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
 __version__ = "0.1.0"
 
-def configure_logging(workspace_log_path: str | None = None):
+_CONFIGURED = False
+_configured_log_path: str | None = None
+_log_file = None
+_log_level = logging.INFO
+
+# Bumped by configure_logging(), so module loggers rebuild themselves
+_config_generation = 0
+
+
+def _default_log_level() -> int:
+    """Get the log level from PIPELINE_LOG_LEVEL (e.g. "DEBUG"), default INFO."""
+    level = logging.getLevelName(os.environ.get("PIPELINE_LOG_LEVEL", "INFO").upper())
+    return level if isinstance(level, int) else logging.INFO
+
+
+def log_enabled_for(level: int) -> bool:
+    """Check whether log events at the given level will be emitted.
+
+    Use this to skip building expensive log arguments for filtered events.
+
+    Args:
+        level: Standard library logging level (e.g. logging.DEBUG)
+    """
+    return level >= _log_level
+
+
+class _LogFile:
+    """Log file handle that is closed once no logger refers to it.
+
+    Loggers assembled under an earlier configuration (e.g. ones returned by
+    bind()) keep writing to the file they were built with, so it mustn't be
+    closed when logging is reconfigured.
+    """
+
+    def __init__(self, path: str, mode: str):
+        self._file = open(path, mode)
+        weakref.finalize(self, self._file.close)
+
+    def write(self, data):
+        return self._file.write(data)
+
+    def flush(self):
+        self._file.flush()
+
+
+class _ModuleLogger:
+    """Module-level logger that follows configure_logging() calls.
+
+    structlog's cache_logger_on_first_use freezes a logger's configuration
+    the first time it is used, so a module-level structlog.get_logger()
+    would ignore any later reconfiguration. This assembles the logger once
+    per configuration instead.
+    """
+
+    def __init__(self):
+        self._logger = None
+        self._generation = -1
+
+    def __getattr__(self, name: str):
+        if self._generation != _config_generation:
+            self._logger = structlog.get_logger().bind()
+            self._generation = _config_generation
+        return getattr(self._logger, name)
+
+
+def get_logger() -> _ModuleLogger:
+    """Get a logger for module scope that honours later configure_logging() calls."""
+    return _ModuleLogger()
+
+
+def configure_logging(workspace_log_path: str | None = None, level: int | None = None):
     """Configure structured logging for the pipeline.
 
+    Calling this again with the same arguments is a no-op, so the assembled
+    loggers are not thrown away. Otherwise loggers from get_logger() pick up
+    the new configuration on their next use.
+
     Args:
         workspace_log_path: Optional path to workspace-specific log file
+        level: Minimum level to emit (defaults to PIPELINE_LOG_LEVEL or INFO)
     """
+    global _CONFIGURED, _configured_log_path, _log_file, _log_level, _config_generation
+
+    if level is None:
+        level = _default_log_level()
+
+    if _CONFIGURED and workspace_log_path == _configured_log_path and level == _log_level:
+        return
+
     processors = [
         structlog.contextvars.merge_contextvars,
         structlog.processors.add_log_level,
@@ -19,19 +111,36 @@ def configure_logging(workspace_log_path: str | None = None):
         structlog.dev.set_exc_info,
     ]
 
-    if workspace_log_path:
+    _log_file = None
+
+    if workspace_log_path and orjson is not None:
+        # JSON logs to file, serialized straight to bytes by orjson
+        processors.append(structlog.processors.JSONRenderer(serializer=orjson.dumps))
+        _log_file = _LogFile(workspace_log_path, "ab")
+        logger_factory = structlog.BytesLoggerFactory(file=_log_file)
+    elif workspace_log_path:
         # JSON logs to file
         processors.append(structlog.processors.JSONRenderer())
+        _log_file = _LogFile(workspace_log_path, "a")
+        logger_factory = structlog.WriteLoggerFactory(file=_log_file)
     else:
         # Human-readable to console
         processors.append(structlog.dev.ConsoleRenderer())
+        logger_factory = structlog.PrintLoggerFactory()
 
     structlog.configure(
         processors=processors,
+        wrapper_class=structlog.make_filtering_bound_logger(level),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
+        logger_factory=logger_factory,
         cache_logger_on_first_use=True,
     )
+    _config_generation += 1
+
+    _CONFIGURED = True
+    _configured_log_path = workspace_log_path
+    _log_level = level
+
 
-# Configure console logging by default
+# Configure console logging by default, before any submodule creates a logger
 configure_logging()
@@ -1,12 +1,85 @@
 """Base agent executor interface."""
+import asyncio
+import functools
+import os
+import re
+import stat
+import time
 from abc import ABC, abstractmethod
-from datetime import datetime
-
-import structlog
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
 
+from .. import get_logger
 from ..models import StepDefinition, StepResult, StepStatus, WorkspaceInfo
 
-logger = structlog.get_logger()
+logger = get_logger()
+
+# Template placeholders like {workspace} or {problem_name}
+_PLACEHOLDER_RE = re.compile(r"\{([^{}\s]+)\}")
+
+# Shared pool for per-output file I/O (stat, hashing); threads start lazily
+_IO_POOL = ThreadPoolExecutor(
+    max_workers=min(8, os.cpu_count() or 1),
+    thread_name_prefix="pipeline-io",
+)
+
+
+@functools.lru_cache(maxsize=256)
+def _read_template(path: str, mtime_ns: int, size: int) -> tuple[str, tuple[str, ...]]:
+    """Read and tokenize a prompt template, cached by file version.
+
+    Args:
+        path: Path to prompt template file
+        mtime_ns: Modification time in nanoseconds (part of cache key)
+        size: File size in bytes (part of cache key)
+
+    Returns:
+        Tuple of (raw text, parts) where parts alternates literal text and
+        placeholder names, starting and ending with literal text
+    """
+    text = Path(path).read_text()
+    return text, tuple(_PLACEHOLDER_RE.split(text))
+
+
+def _output_status(full_path: str) -> str | None:
+    """Check a single output file.
+
+    Returns:
+        "missing" if it doesn't exist, "empty" if it is an empty file,
+        None otherwise
+    """
+    # A single stat() answers exists/is_file/size
+    try:
+        st = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        return "missing"
+
+    if stat.S_ISREG(st.st_mode) and st.st_size == 0:
+        return "empty"
+    return None
+
+
+def _now() -> datetime:
+    """Get the current time for step and workflow timestamps.
+
+    Timestamps are naive local time, matching existing state files, so
+    durations can be computed across old and new records.
+    """
+    return datetime.now()
+
+
+def _completed_at(started_at: datetime, start_ns: int) -> datetime:
+    """Get a step's completion time from its monotonic start reading.
+
+    Args:
+        started_at: Wall-clock time the step started
+        start_ns: time.monotonic_ns() reading taken at the same moment
+
+    Returns:
+        Completion time; the duration is unaffected by wall-clock adjustments
+    """
+    return started_at + timedelta(microseconds=(time.monotonic_ns() - start_ns) // 1000)
 
 
 class AgentExecutor(ABC):
@@ -51,6 +124,27 @@ class AgentExecutor(ABC):
         """
         pass
 
+    async def aexecute_step(
+        self,
+        step: StepDefinition,
+        workspace: WorkspaceInfo,
+        context: dict[str, str] | None = None,
+    ) -> StepResult:
+        """Execute a workflow step without blocking the event loop.
+
+        The default implementation runs execute_step() in a worker thread,
+        so synchronous executors can still be scheduled concurrently.
+
+        Args:
+            step: Step definition from workflow
+            workspace: Workspace containing all necessary directories
+            context: Optional context variables for prompt substitution
+
+        Returns:
+            StepResult with execution outcome
+        """
+        return await asyncio.to_thread(self.execute_step, step, workspace, context)
+
     def validate_outputs(
         self,
         step: StepDefinition,
@@ -67,13 +161,15 @@ class AgentExecutor(ABC):
         """
         missing = []
 
-        for output_path in step.outputs:
-            # Output paths are workspace-relative
-            full_path = workspace.workspace_path / output_path
+        # Output paths are workspace-relative
+        base = os.fspath(workspace.workspace_path)
+        full_paths = [os.path.join(base, output_path) for output_path in step.outputs]
+        statuses = _IO_POOL.map(_output_status, full_paths)
 
-            if not full_path.exists():
+        for output_path, status in zip(step.outputs, statuses):
+            if status == "missing":
                 missing.append(output_path)
-            elif full_path.is_file() and full_path.stat().st_size == 0:
+            elif status == "empty":
                 # Warn about empty files but don't fail
                 logger.warning(
                     "output_file_empty",
@@ -100,18 +196,57 @@ class AgentExecutor(ABC):
         Raises:
             FileNotFoundError: If prompt file doesn't exist
         """
-        from pathlib import Path
+        try:
+            st = os.stat(prompt_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Prompt template not found: {prompt_path}") from None
+
+        prompt_text, parts = _read_template(str(prompt_path), st.st_mtime_ns, st.st_size)
+
+        if not context:
+            return prompt_text
+
+        # Substitute context variables in a single pass; unknown
+        # placeholders are left untouched
+        substituted = list(parts)
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            substituted[i] = context.get(name, f"{{{name}}}")
 
-        prompt_file = Path(prompt_path)
+        return "".join(substituted)
 
-        if not prompt_file.exists():
-            raise FileNotFoundError(f"Prompt template not found: {prompt_path}")
 
-        prompt_text = prompt_file.read_text()
+class AsyncAgentExecutor(AgentExecutor):
+    """Base class for executors implemented natively as coroutines.
+
+    Subclasses implement aexecute_step(); execute_step() is provided for
+    synchronous callers and drives the coroutine to completion.
+    """
+
+    @abstractmethod
+    async def aexecute_step(
+        self,
+        step: StepDefinition,
+        workspace: WorkspaceInfo,
+        context: dict[str, str] | None = None,
+    ) -> StepResult:
+        """Execute a workflow step asynchronously.
+
+        Args:
+            step: Step definition from workflow
+            workspace: Workspace containing all necessary directories
+            context: Optional context variables for prompt substitution
 
-        # Substitute context variables
-        if context:
-            for key, value in context.items():
-                prompt_text = prompt_text.replace(f"{{{key}}}", value)
+        Returns:
+            StepResult with execution outcome
+        """
+        pass
 
-        return prompt_text
+    def execute_step(
+        self,
+        step: StepDefinition,
+        workspace: WorkspaceInfo,
+        context: dict[str, str] | None = None,
+    ) -> StepResult:
+        """Execute a workflow step, blocking until it completes."""
+        return asyncio.run(self.aexecute_step(step, workspace, context))
@@ -1,35 +1,189 @@
 """Claude Code agent executor using subprocess."""
-import json
-import subprocess
-from datetime import datetime
+import asyncio
+import functools
+import hashlib
+import os
+import re
+import shlex
+import signal
+import stat
+import time
+from collections import deque
 from pathlib import Path
 
-import structlog
+from .. import get_logger
+from ..models import StepDefinition, StepResult, StepStatus, WorkspaceInfo
+from .base import _IO_POOL, AsyncAgentExecutor, _completed_at, _now
 
-from ..models import StepDefinition, StepResult, StepStatus, WorkspaceInfo, ModelName
-from .base import AgentExecutor
+logger = get_logger()
 
-logger = structlog.get_logger()
+# Auto-approve common tools to avoid interactive prompts
+# Note: Only safe in controlled pipeline environment
+_ALLOWED_TOOLS = ("Read", "Write", "Edit", "Glob", "Grep", "Bash")
+_ALLOWED_TOOLS_ARGS = tuple(arg for tool in _ALLOWED_TOOLS for arg in ("--allowedTools", tool))
 
-# Map our model names to Claude Code CLI model names
-MODEL_MAP = {
-    ModelName.HAIKU: "haiku",
-    ModelName.SONNET: "sonnet",
-    ModelName.OPUS: "opus",
-}
+# Token usage patterns like "1234 tokens" (matched against raw output lines)
+_TOKEN_RE = re.compile(rb"(\d+)\s+tokens?", re.IGNORECASE)
 
+# Only the tail of agent output is kept in memory: at most this many lines,
+# and at most this many bytes in total
+_OUTPUT_TAIL_LINES = 200
+_OUTPUT_TAIL_BYTES = 16 * 1024
+_READ_CHUNK_SIZE = 64 * 1024
+# Lines longer than this are split rather than buffered indefinitely
+_MAX_LINE_BYTES = 4 * 1024
+# How long to wait for a killed agent to be reaped before giving up on it
+_KILL_TIMEOUT = 5.0
+# How long to keep reading output once the agent has exited
+_DRAIN_TIMEOUT = 1.0
 
-class ClaudeCodeExecutor(AgentExecutor):
+# Output content hash: BLAKE2b truncated to 4 bytes (8 hex chars)
+_output_hash = functools.partial(hashlib.blake2b, digest_size=4)
+
+
+@functools.lru_cache(maxsize=4096)
+def _fingerprint_hash(path: str, mtime_ns: int, size: int, ino: int) -> str:
+    """Hash a file's content, cached by its stat fingerprint.
+
+    The stat fields are part of the cache key, so rewriting the file
+    (which changes mtime/size/inode) naturally invalidates the entry.
+
+    Args:
+        path: File path
+        mtime_ns: Modification time in nanoseconds
+        size: File size in bytes
+        ino: Inode number
+
+    Returns:
+        Hex digest of the file content
+    """
+    # Stream the file through the hash rather than reading it whole
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, _output_hash).hexdigest()
+
+
+class _LazyRepr:
+    """Log value whose text is only built if the event is rendered.
+
+    structlog's renderers call repr() on non-primitive values, so wrapping
+    an expensive formatter defers it until (and unless) it's needed.
+    """
+
+    __slots__ = ("_func",)
+
+    def __init__(self, func):
+        self._func = func
+
+    def __repr__(self) -> str:
+        return self._func()
+
+    __str__ = __repr__
+
+
+async def _read_stream_tail(
+    stream: asyncio.StreamReader,
+    scan_tokens: bool = False,
+) -> tuple[str, int]:
+    """Consume a process stream, keeping only its last lines.
+
+    Args:
+        stream: Process stdout or stderr
+        scan_tokens: Whether to look for token usage (first match wins)
+
+    Returns:
+        Tuple of (last lines joined, token count or 0); the tail holds at
+        most _OUTPUT_TAIL_LINES lines and _OUTPUT_TAIL_BYTES bytes
+    """
+    tail: deque[bytes] = deque()
+    tail_bytes = 0
+    tokens = None
+    pending = b""
+
+    def add_line(line: bytes):
+        # Over-long lines are kept as several of at most _MAX_LINE_BYTES
+        for start in range(0, len(line) or 1, _MAX_LINE_BYTES):
+            keep(line[start:start + _MAX_LINE_BYTES])
+
+    def keep(line: bytes):
+        nonlocal tail_bytes, tokens
+        if scan_tokens and tokens is None:
+            # Claude Code may output token usage in various formats
+            # This is a simple parser - adjust based on actual output format
+            match = _TOKEN_RE.search(line)
+            if match:
+                tokens = int(match.group(1))
+        tail.append(line)
+        tail_bytes += len(line)
+        while len(tail) > _OUTPUT_TAIL_LINES or tail_bytes > _OUTPUT_TAIL_BYTES:
+            tail_bytes -= len(tail.popleft())
+
+    while chunk := await stream.read(_READ_CHUNK_SIZE):
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            add_line(line)
+        if len(pending) > _MAX_LINE_BYTES:
+            # Don't buffer an unfinished long line: keep its complete pieces
+            split = len(pending) - len(pending) % _MAX_LINE_BYTES
+            add_line(pending[:split])
+            pending = pending[split:]
+
+    if pending:
+        add_line(pending)
+
+    return b"\n".join(tail).decode(errors="replace"), tokens or 0
+
+
+class _AgentProtocol(asyncio.subprocess.SubprocessStreamProtocol):
+    """Subprocess stream protocol that also reports when the process exits.
+
+    Process.wait() only returns once the output pipes are closed too, which
+    a background child of the agent can put off indefinitely.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        super().__init__(limit=_READ_CHUNK_SIZE, loop=loop)
+        self.exited = loop.create_future()
+
+    def process_exited(self):
+        super().process_exited()
+        if not self.exited.done():
+            self.exited.set_result(None)
+
+
+def _kill_process_group(pgid: int):
+    """SIGKILL every process in a group, if any are still running."""
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def _hash_one(full_path: str) -> str | None:
+    """Hash a single output file, or return None if it isn't a file."""
+    # A single stat() answers exists/is_file and feeds the fingerprint cache
+    try:
+        st = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+    if not stat.S_ISREG(st.st_mode):
+        return None
+    return _fingerprint_hash(full_path, st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class ClaudeCodeExecutor(AsyncAgentExecutor):
     """Executor that runs steps using Claude Code CLI via subprocess.
 
     This executor invokes the `claude` CLI tool with appropriate flags
-    to run an agent in a sandboxed workspace environment.
+    to run an agent in a sandboxed workspace environment. The subprocess
+    is driven with asyncio so independent steps can run concurrently.
     """
 
     def __init__(self):
         super().__init__(name="claude_code")
 
-    def execute_step(
+    async def aexecute_step(
         self,
         step: StepDefinition,
         workspace: WorkspaceInfo,
@@ -45,10 +199,11 @@ class ClaudeCodeExecutor(AgentExecutor):
         Returns:
             StepResult with execution outcome
         """
-        started_at = datetime.now()
-        context = context or {}
+        started_at = _now()
+        start_ns = time.monotonic_ns()
 
-        # Add workspace path to context
+        # Add workspace path to context (copied, since steps may run concurrently)
+        context = dict(context or {})
         context["workspace"] = str(workspace.workspace_path)
 
         logger.info(
@@ -68,27 +223,23 @@ class ClaudeCodeExecutor(AgentExecutor):
             logger.debug(
                 "claude_code_command",
                 step_id=step.id,
-                cmd=" ".join(cmd),
+                cmd=_LazyRepr(lambda: shlex.join(cmd)),
             )
 
-            # Execute with timeout
-            result = subprocess.run(
-                cmd,
-                cwd=workspace.workspace_path,  # Run in workspace root
-                capture_output=True,
-                timeout=step.timeout,
-                text=True,
+            # Execute with timeout (run in workspace root)
+            returncode, stdout, stderr, tokens_used = await self._run_command(
+                cmd, workspace.workspace_path, step.timeout
             )
 
-            completed_at = datetime.now()
+            completed_at = _completed_at(started_at, start_ns)
 
             # Check exit code
-            if result.returncode != 0:
+            if returncode != 0:
                 logger.error(
                     "claude_code_failed",
                     step_id=step.id,
-                    exit_code=result.returncode,
-                    stderr=result.stderr[:500],
+                    exit_code=returncode,
+                    stderr=stderr[-500:],
                 )
 
                 return StepResult(
@@ -96,15 +247,14 @@ class ClaudeCodeExecutor(AgentExecutor):
                     status=StepStatus.FAILED,
                     started_at=started_at,
                     completed_at=completed_at,
-                    error=f"Claude Code exited with code {result.returncode}: {result.stderr[:500]}",
-                    agent_output=result.stdout,
+                    error=f"Claude Code exited with code {returncode}: {stderr[-500:]}",
+                    agent_output=stdout,
                 )
 
-            # Parse output for token usage (if available)
-            tokens_used = self._extract_token_usage(result.stdout)
-
-            # Validate expected outputs
-            all_exist, missing = self.validate_outputs(step, workspace)
+            # Validate expected outputs (filesystem work, kept off the event loop)
+            all_exist, missing = await asyncio.to_thread(
+                self.validate_outputs, step, workspace
+            )
 
             if not all_exist:
                 logger.warning(
@@ -120,11 +270,11 @@ class ClaudeCodeExecutor(AgentExecutor):
                     completed_at=completed_at,
                     error=f"Expected outputs not created: {missing}",
                     tokens_used=tokens_used,
-                    agent_output=result.stdout,
+                    agent_output=stdout,
                 )
 
             # Success!
-            outputs = self._hash_outputs(step, workspace)
+            outputs = await asyncio.to_thread(self._hash_outputs, step, workspace)
 
             logger.info(
                 "claude_code_step_completed",
@@ -140,10 +290,10 @@ class ClaudeCodeExecutor(AgentExecutor):
                 completed_at=completed_at,
                 outputs=outputs,
                 tokens_used=tokens_used,
-                agent_output=result.stdout,
+                agent_output=stdout,
             )
 
-        except subprocess.TimeoutExpired:
+        except asyncio.TimeoutError:
             logger.error(
                 "claude_code_timeout",
                 step_id=step.id,
@@ -154,7 +304,7 @@ class ClaudeCodeExecutor(AgentExecutor):
                 step_id=step.id,
                 status=StepStatus.FAILED,
                 started_at=started_at,
-                completed_at=datetime.now(),
+                completed_at=_completed_at(started_at, start_ns),
                 error=f"Execution timed out after {step.timeout} seconds",
             )
 
@@ -169,10 +319,86 @@ class ClaudeCodeExecutor(AgentExecutor):
                 step_id=step.id,
                 status=StepStatus.FAILED,
                 started_at=started_at,
-                completed_at=datetime.now(),
+                completed_at=_completed_at(started_at, start_ns),
                 error=str(e),
             )
 
+    async def _run_command(
+        self,
+        cmd: list[str],
+        cwd: Path,
+        timeout: int,
+    ) -> tuple[int, str, str, int]:
+        """Run a command asynchronously, killing it if it exceeds the timeout.
+
+        Output is streamed rather than buffered: only the last lines of
+        stdout/stderr are kept, and stdout is scanned for token usage as
+        it arrives.
+
+        The command runs in its own session, and the run is over when the
+        agent itself exits. Any processes it started that are still running
+        then (or on timeout) are killed with it; otherwise they would keep
+        running, and holding the output pipes open.
+
+        Args:
+            cmd: Command as list of strings
+            cwd: Working directory for the process
+            timeout: Timeout in seconds
+
+        Returns:
+            Tuple of (exit code, stdout tail, stderr tail, tokens used)
+
+        Raises:
+            asyncio.TimeoutError: If the process does not finish in time
+        """
+        # As asyncio.create_subprocess_exec(), but keeping the transport so
+        # the pipes can be closed without waiting for EOF
+        loop = asyncio.get_running_loop()
+        transport, protocol = await loop.subprocess_exec(
+            lambda: _AgentProtocol(loop),
+            *cmd,
+            cwd=cwd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+        )
+        proc = asyncio.subprocess.Process(transport, protocol, loop)
+        readers = asyncio.gather(
+            _read_stream_tail(proc.stdout, scan_tokens=True),
+            _read_stream_tail(proc.stderr),
+        )
+
+        def close_pipes():
+            for fd in (1, 2):
+                transport.get_pipe_transport(fd).close()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(protocol.exited), timeout=timeout)
+        except BaseException:
+            # Timed out or cancelled: don't leave the agent (or its children)
+            # running. The group is named by the agent's pid, as its leader.
+            _kill_process_group(proc.pid)
+            # A child that left the session could still hold the pipes open;
+            # close them rather than waiting for EOF
+            close_pipes()
+            await asyncio.wait([readers, protocol.exited], timeout=_KILL_TIMEOUT)
+            raise
+
+        # The agent is done; stop anything it left running in the background,
+        # then collect the rest of its output
+        _kill_process_group(proc.pid)
+        try:
+            (stdout, tokens_used), (stderr, _) = await asyncio.wait_for(
+                asyncio.shield(readers), timeout=_DRAIN_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            # Keep what was read before the pipes are cut off
+            close_pipes()
+            (stdout, tokens_used), (stderr, _) = await readers
+
+        returncode = proc.returncode
+        return returncode, stdout, stderr, tokens_used
+
     def _build_command(
         self,
         step: StepDefinition,
@@ -189,22 +415,17 @@ class ClaudeCodeExecutor(AgentExecutor):
         Returns:
             Command as list of strings
         """
-        model = MODEL_MAP.get(step.model, "sonnet")
-
+        # ModelName values are the Claude Code CLI model aliases
         cmd = [
             "claude",
             "-p", prompt_text,
-            "--model", model,
+            "--model", step.model.value,
             "--max-turns", str(step.max_turns),
             "--add-dir", str(workspace.workspace_path),
             "--no-session-persistence",
         ]
 
-        # Auto-approve common tools to avoid interactive prompts
-        # Note: Only safe in controlled pipeline environment
-        allowed_tools = ["Read", "Write", "Edit", "Glob", "Grep", "Bash"]
-        for tool in allowed_tools:
-            cmd.extend(["--allowedTools", tool])
+        cmd.extend(_ALLOWED_TOOLS_ARGS)
 
         # Auto-approve common tools to avoid interactive prompts
         # Note: This should be used carefully and only in controlled environments
@@ -213,28 +434,6 @@ class ClaudeCodeExecutor(AgentExecutor):
 
         return cmd
 
-    def _extract_token_usage(self, output: str) -> int:
-        """Extract token usage from Claude Code output.
-
-        Args:
-            output: stdout from Claude Code
-
-        Returns:
-            Token count, or 0 if not found
-        """
-        # Claude Code may output token usage in various formats
-        # This is a simple parser - adjust based on actual output format
-        try:
-            # Look for patterns like "Tokens: 1234" or similar
-            import re
-            match = re.search(r"(\d+)\s+tokens?", output, re.IGNORECASE)
-            if match:
-                return int(match.group(1))
-        except Exception:
-            pass
-
-        return 0
-
     def _hash_outputs(
         self,
         step: StepDefinition,
@@ -249,16 +448,12 @@ class ClaudeCodeExecutor(AgentExecutor):
         Returns:
             Dict mapping output paths to content hashes
         """
-        import hashlib
-
-        outputs = {}
-
-        for output_path in step.outputs:
-            full_path = workspace.workspace_path / output_path
-
-            if full_path.exists() and full_path.is_file():
-                content = full_path.read_bytes()
-                content_hash = hashlib.md5(content).hexdigest()[:8]
-                outputs[output_path] = content_hash
-
-        return outputs
+        base = os.fspath(workspace.workspace_path)
+        full_paths = [os.path.join(base, output_path) for output_path in step.outputs]
+        hashes = _IO_POOL.map(_hash_one, full_paths)
+
+        return {
+            output_path: content_hash
+            for output_path, content_hash in zip(step.outputs, hashes)
+            if content_hash is not None
+        }
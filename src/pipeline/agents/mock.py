@@ -1,14 +1,97 @@
 """Mock agent executor for testing without real Claude inference."""
+import functools
+import hashlib
+import logging
+import os
 import time
 from datetime import datetime
-from pathlib import Path
-
-import structlog
+from string import Template
 
+from .. import get_logger, log_enabled_for
 from ..models import StepDefinition, StepResult, StepStatus, WorkspaceInfo
-from .base import AgentExecutor
+from .base import AgentExecutor, _completed_at, _now
+
+logger = get_logger()
+
+_MD_TEMPLATE = Template("""# Mock Output: ${step_id}
+
+This is a mock output file generated for testing.
+
+**Problem**: ${problem_name}
+**Step**: ${step_id}
+**Model**: ${model}
+
+Mock analysis and content go here.
+""")
 
-logger = structlog.get_logger()
+# Test step: generate test skeleton
+_PY_TEST_TEMPLATE = Template('''"""Mock tests for ${problem_name}"""
+
+def test_${problem_name}():
+    """Mock test function."""
+    # TODO: Implement actual tests
+    assert True
+
+def solution(input_data):
+    """Placeholder solution function."""
+    return input_data
+
+if __name__ == "__main__":
+    # Run tests
+    test_${problem_name}()
+    print("Mock tests passed!")
+''')
+
+# Solution step: generate solution skeleton
+_PY_SOLUTION_TEMPLATE = Template('''"""Mock solution for ${problem_name}"""
+
+def solution(input_data):
+    """Mock solution implementation.
+
+    Generated by step: ${step_id}
+    """
+    # TODO: Implement actual solution
+    return input_data
+
+if __name__ == "__main__":
+    # Mock test execution
+    result = solution("test")
+    print(f"Mock solution result: {result}")
+''')
+
+# Generic text file
+_TXT_TEMPLATE = Template("""Mock output for step: ${step_id}
+Problem: ${problem_name}
+Generated at: ${generated_at}
+
+This is mock content for testing purposes.
+""")
+
+_TEMPLATES = {
+    "md": _MD_TEMPLATE,
+    "py_test": _PY_TEST_TEMPLATE,
+    "py_solution": _PY_SOLUTION_TEMPLATE,
+}
+
+
+@functools.lru_cache(maxsize=256)
+def _render_mock(kind: str, step_id: str, problem_name: str, model: str) -> str:
+    """Render deterministic mock content (everything except plain text).
+
+    Args:
+        kind: Template kind ("md", "py_test" or "py_solution")
+        step_id: Step identifier
+        problem_name: Problem name from context
+        model: Model name
+
+    Returns:
+        Mock file content
+    """
+    return _TEMPLATES[kind].substitute(
+        step_id=step_id,
+        problem_name=problem_name,
+        model=model,
+    )
 
 
 class MockAgentExecutor(AgentExecutor):
@@ -43,7 +126,8 @@ class MockAgentExecutor(AgentExecutor):
         Returns:
             StepResult with mock execution outcome
         """
-        started_at = datetime.now()
+        started_at = _now()
+        start_ns = time.monotonic_ns()
         context = context or {}
 
         logger.info(
@@ -52,6 +136,10 @@ class MockAgentExecutor(AgentExecutor):
             workspace_id=workspace.workspace_id,
         )
 
+        status = StepStatus.FAILED
+        outputs = {}
+        error = None
+
         try:
             # Load prompt to check for mock directives
             prompt_text = self.load_prompt_template(step.prompt_strategy, context)
@@ -61,50 +149,31 @@ class MockAgentExecutor(AgentExecutor):
             should_slow = "MOCK_SLOW" in prompt_text
 
             if should_slow:
-                logger.debug("mock_delay", step_id=step.id, seconds=2)
+                if log_enabled_for(logging.DEBUG):
+                    logger.debug("mock_delay", step_id=step.id, seconds=2)
                 time.sleep(2)
 
             if should_fail:
                 logger.info("mock_step_failed", step_id=step.id)
-                return StepResult(
-                    step_id=step.id,
-                    status=StepStatus.FAILED,
-                    started_at=started_at,
-                    completed_at=datetime.now(),
-                    error="Mock failure triggered by MOCK_FAIL directive",
-                    tokens_used=100,  # Mock token count
-                )
-
-            # Generate mock outputs
-            outputs = self._generate_mock_outputs(step, workspace, context)
-
-            # Validate outputs were created
-            all_exist, missing = self.validate_outputs(step, workspace)
-
-            if not all_exist:
-                return StepResult(
-                    step_id=step.id,
-                    status=StepStatus.FAILED,
-                    started_at=started_at,
-                    completed_at=datetime.now(),
-                    error=f"Mock failed to create outputs: {missing}",
-                    tokens_used=50,
-                )
-
-            logger.info(
-                "mock_step_completed",
-                step_id=step.id,
-                outputs=list(outputs.keys()),
-            )
-
-            return StepResult(
-                step_id=step.id,
-                status=StepStatus.COMPLETED,
-                started_at=started_at,
-                completed_at=datetime.now(),
-                outputs=outputs,
-                tokens_used=250,  # Mock token count
-            )
+                error = "Mock failure triggered by MOCK_FAIL directive"
+                tokens_used = 100  # Mock token count
+            else:
+                # Generate mock outputs; files that were written are known
+                # to exist, so there's no need to stat them again
+                outputs, missing = self._generate_mock_outputs(step, workspace, context)
+
+                if missing:
+                    outputs = {}
+                    error = f"Mock failed to create outputs: {missing}"
+                    tokens_used = 50
+                else:
+                    logger.info(
+                        "mock_step_completed",
+                        step_id=step.id,
+                        outputs=list(outputs.keys()),
+                    )
+                    status = StepStatus.COMPLETED
+                    tokens_used = 250  # Mock token count
 
         except Exception as e:
             logger.error(
@@ -112,22 +181,26 @@ class MockAgentExecutor(AgentExecutor):
                 step_id=step.id,
                 error=str(e),
             )
+            outputs = {}
+            error = str(e)
+            tokens_used = 0
 
-            return StepResult(
-                step_id=step.id,
-                status=StepStatus.FAILED,
-                started_at=started_at,
-                completed_at=datetime.now(),
-                error=str(e),
-                tokens_used=0,
-            )
+        return StepResult(
+            step_id=step.id,
+            status=status,
+            started_at=started_at,
+            completed_at=_completed_at(started_at, start_ns),
+            outputs=outputs,
+            error=error,
+            tokens_used=tokens_used,
+        )
 
     def _generate_mock_outputs(
         self,
         step: StepDefinition,
         workspace: WorkspaceInfo,
         context: dict[str, str],
-    ) -> dict[str, str]:
+    ) -> tuple[dict[str, str], list[str]]:
         """Generate mock output files.
 
         Args:
@@ -136,36 +209,51 @@ class MockAgentExecutor(AgentExecutor):
             context: Context variables
 
         Returns:
-            Dict mapping output paths to content hashes
+            Tuple of (dict mapping output paths to content hashes,
+            list of outputs that could not be written)
         """
         outputs = {}
+        missing = []
+        base = os.fspath(workspace.workspace_path)
 
         for output_path in step.outputs:
-            full_path = workspace.workspace_path / output_path
-
-            # Create parent directories if needed
-            full_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # Generate mock content based on file type
-            content = self._generate_mock_content(step, output_path, context)
-
-            # Write mock file
-            full_path.write_text(content)
+            full_path = os.path.join(base, output_path)
+
+            # Generate mock content based on file type, encoded once for
+            # both the write and the hash
+            encoded = self._generate_mock_content(step, output_path, context).encode()
+
+            try:
+                # Create parent directories if needed
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+
+                # Write mock file (binary mode skips the text I/O layer)
+                with open(full_path, "wb") as f:
+                    f.write(encoded)
+            except OSError as e:
+                logger.warning(
+                    "mock_output_write_failed",
+                    step_id=step.id,
+                    path=output_path,
+                    error=str(e),
+                )
+                missing.append(output_path)
+                continue
 
             # Calculate simple hash (for tracking)
-            import hashlib
-            content_hash = hashlib.md5(content.encode()).hexdigest()[:8]
+            content_hash = hashlib.blake2b(encoded, digest_size=4).hexdigest()
 
             outputs[output_path] = content_hash
 
-            logger.debug(
-                "mock_output_created",
-                step_id=step.id,
-                path=output_path,
-                size=len(content),
-            )
+            if log_enabled_for(logging.DEBUG):
+                logger.debug(
+                    "mock_output_created",
+                    step_id=step.id,
+                    path=output_path,
+                    size=len(encoded),
+                )
 
-        return outputs
+        return outputs, missing
 
     def _generate_mock_content(
         self,
@@ -187,60 +275,15 @@ class MockAgentExecutor(AgentExecutor):
 
         # Generate different content based on step ID and file type
         if output_path.endswith(".md"):
-            return f"""# Mock Output: {step.id}
-
-This is a mock output file generated for testing.
-
-**Problem**: {problem_name}
-**Step**: {step.id}
-**Model**: {step.model.value}
-
-Mock analysis and content go here.
-"""
-
+            kind = "md"
         elif output_path.endswith(".py"):
-            # Generate mock Python code
-            if "test" in step.id.lower():
-                # Test step: generate test skeleton
-                return f'''"""Mock tests for {problem_name}"""
-
-def test_{problem_name}():
-    """Mock test function."""
-    # TODO: Implement actual tests
-    assert True
-
-def solution(input_data):
-    """Placeholder solution function."""
-    return input_data
-
-if __name__ == "__main__":
-    # Run tests
-    test_{problem_name}()
-    print("Mock tests passed!")
-'''
-            else:
-                # Solution step: generate solution skeleton
-                return f'''"""Mock solution for {problem_name}"""
-
-def solution(input_data):
-    """Mock solution implementation.
-
-    Generated by step: {step.id}
-    """
-    # TODO: Implement actual solution
-    return input_data
-
-if __name__ == "__main__":
-    # Mock test execution
-    result = solution("test")
-    print(f"Mock solution result: {{result}}")
-'''
-
+            kind = "py_test" if "test" in step.id.lower() else "py_solution"
         else:
-            # Generic text file
-            return f"""Mock output for step: {step.id}
-Problem: {problem_name}
-Generated at: {datetime.now().isoformat()}
+            # Plain text includes a timestamp, so it isn't cached
+            return _TXT_TEMPLATE.substitute(
+                step_id=step.id,
+                problem_name=problem_name,
+                generated_at=datetime.now().isoformat(),
+            )
 
-This is mock content for testing purposes.
-"""
+        return _render_mock(kind, step.id, problem_name, step.model.value)
@@ -1,24 +1,27 @@
 """Command-line interface for the pipeline."""
 from __future__ import annotations
 
-import argparse
+import asyncio
 import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from types import SimpleNamespace
+from typing import NamedTuple
 
-import structlog
-
-from . import configure_logging
-from .executor import WorkflowExecutor
-from .parser import parse_workflow, validate_workflow
+from . import get_logger
 from .workspace import create_workspace, get_workspace, list_workspaces
 from .state import load_state, get_state_summary, can_resume
 
-logger = structlog.get_logger()
+logger = get_logger()
 
 
 def cmd_run(args):
     """Run a new workflow execution."""
+    # Imported here so list/status don't pay for the executor and agents
+    from .executor import WorkflowExecutor
+    from .parser import parse_workflow, validate_workflow
+
     workflow_path = Path(args.workflow)
     problem_path = Path(args.problem) if args.problem else None
 
@@ -66,10 +69,12 @@ def cmd_run(args):
     # Execute workflow
     print(f"\n🚀 Starting workflow execution...\n")
 
-    executor = WorkflowExecutor()
+    executor = WorkflowExecutor(max_workers=args.max_workers)
 
     try:
-        state = executor.run(workflow, workspace, problem_path, context)
+        state = asyncio.run(
+            executor.arun(workflow, workspace, problem_path, context, workflow_path=workflow_path)
+        )
 
         # Print summary
         print(f"\n{'='*60}")
@@ -108,6 +113,9 @@ def cmd_run(args):
 
 def cmd_resume(args):
     """Resume a workflow execution from saved state."""
+    from .executor import WorkflowExecutor
+    from .parser import parse_workflow
+
     workspace_id = args.workspace
 
     try:
@@ -129,10 +137,12 @@ def cmd_resume(args):
     print(f"  Completed steps: {len(state.completed_steps)}")
     print(f"  Pending steps: {len(state.pending_steps)}")
 
-    # Load workflow definition
-    # Note: We need to know which workflow file to use
-    # For now, assume standard path - in production, store this in state
-    workflow_path = Path(f"workflows/{state.workflow_name}.yaml")
+    # Load workflow definition, preferring the path recorded at run time.
+    # Older state files don't record it, so fall back to the standard path.
+    if state.workflow_path and Path(state.workflow_path).exists():
+        workflow_path = Path(state.workflow_path)
+    else:
+        workflow_path = Path(f"workflows/{state.workflow_name}.yaml")
 
     if not workflow_path.exists():
         # Try to find workflow by searching
@@ -159,10 +169,10 @@ def cmd_resume(args):
     # Resume execution
     print(f"\n🚀 Resuming workflow execution...\n")
 
-    executor = WorkflowExecutor()
+    executor = WorkflowExecutor(max_workers=args.max_workers)
 
     try:
-        state = executor.resume(workflow, workspace)
+        state = asyncio.run(executor.aresume(workflow, workspace))
 
         # Print summary
         print(f"\n{'='*60}")
@@ -251,8 +261,11 @@ def cmd_list(args):
     print(f"Workspaces ({len(workspaces)}):")
     print(f"{'='*60}\n")
 
-    for ws in workspaces:
-        state = load_state(ws)
+    # Parse state files concurrently; the work is mostly file I/O
+    with ThreadPoolExecutor(max_workers=min(8, len(workspaces))) as pool:
+        states = list(pool.map(load_state, workspaces))
+
+    for ws, state in zip(workspaces, states):
         if state:
             status = "✓ complete" if state.is_complete else "⏳ in progress"
             if state.has_failures:
@@ -266,8 +279,102 @@ def cmd_list(args):
     return 0
 
 
-def main():
-    """Main CLI entry point."""
+class _Option(NamedTuple):
+    """A --flag taking one value."""
+    flag: str
+    help: str
+    required: bool = False
+    type: type = str
+    default: object = None
+
+    @property
+    def dest(self) -> str:
+        return self.flag.lstrip("-").replace("-", "_")
+
+
+def _positive_int(value: str) -> int:
+    """Parse an option value that must be a whole number of at least 1."""
+    number = int(value)
+    if number < 1:
+        import argparse
+
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+_MAX_WORKERS_OPTION = _Option(
+    "--max-workers",
+    "Maximum number of independent steps to run concurrently",
+    type=_positive_int,
+    default=1,
+)
+
+# Command name -> (handler, help, options)
+_COMMANDS = {
+    "run": (cmd_run, "Run a workflow", (
+        _Option("--workflow", "Path to workflow YAML file", required=True),
+        _Option("--problem", "Path to problem description file"),
+        _MAX_WORKERS_OPTION,
+    )),
+    "resume": (cmd_resume, "Resume a workflow", (
+        _Option("--workspace", "Workspace ID to resume", required=True),
+        _MAX_WORKERS_OPTION,
+    )),
+    "status": (cmd_status, "Show workflow status", (
+        _Option("--workspace", "Workspace ID to check", required=True),
+    )),
+    "list": (cmd_list, "List all workspaces", ()),
+}
+
+
+def _fast_parse(argv: list[str], options: tuple[_Option, ...]) -> SimpleNamespace | None:
+    """Parse well-formed command arguments without building an argparse tree.
+
+    Args:
+        argv: Arguments after the command name
+        options: Options accepted by the command
+
+    Returns:
+        Parsed arguments, or None if argv needs argparse (help, errors, or
+        anything unusual) so it can report it exactly as before
+    """
+    by_flag = {option.flag: option for option in options}
+    values = {option.dest: option.default for option in options}
+    seen = set()
+
+    i = 0
+    while i < len(argv):
+        flag, sep, value = argv[i].partition("=")
+        option = by_flag.get(flag)
+        if option is None or flag in seen:
+            return None
+
+        if not sep:
+            i += 1
+            if i == len(argv) or argv[i].startswith("-"):
+                return None
+            value = argv[i]
+
+        # Any rejected value (ValueError, argparse.ArgumentTypeError) is
+        # left for argparse to report
+        try:
+            values[option.dest] = option.type(value)
+        except Exception:
+            return None
+
+        seen.add(flag)
+        i += 1
+
+    if any(option.required and option.flag not in seen for option in options):
+        return None
+
+    return SimpleNamespace(**values)
+
+
+def _build_parser():
+    """Build the full argparse parser (used for help and error reporting)."""
+    import argparse
+
     parser = argparse.ArgumentParser(
         description="Automated software delivery pipeline",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -275,55 +382,41 @@ def main():
 
     subparsers = parser.add_subparsers(dest="command", help="Command to run")
 
-    # Run command
-    run_parser = subparsers.add_parser("run", help="Run a workflow")
-    run_parser.add_argument(
-        "--workflow",
-        required=True,
-        help="Path to workflow YAML file",
-    )
-    run_parser.add_argument(
-        "--problem",
-        help="Path to problem description file",
-    )
+    for name, (_, help_text, options) in _COMMANDS.items():
+        command_parser = subparsers.add_parser(name, help=help_text)
+        for option in options:
+            command_parser.add_argument(
+                option.flag,
+                required=option.required,
+                type=option.type,
+                default=option.default,
+                help=option.help,
+            )
 
-    # Resume command
-    resume_parser = subparsers.add_parser("resume", help="Resume a workflow")
-    resume_parser.add_argument(
-        "--workspace",
-        required=True,
-        help="Workspace ID to resume",
-    )
+    return parser
 
-    # Status command
-    status_parser = subparsers.add_parser("status", help="Show workflow status")
-    status_parser.add_argument(
-        "--workspace",
-        required=True,
-        help="Workspace ID to check",
-    )
 
-    # List command
-    list_parser = subparsers.add_parser("list", help="List all workspaces")
+def main(argv: list[str] | None = None):
+    """Main CLI entry point."""
+    argv = sys.argv[1:] if argv is None else argv
+
+    # Fast path: dispatch well-formed commands without argparse
+    if argv and argv[0] in _COMMANDS:
+        handler, _, options = _COMMANDS[argv[0]]
+        args = _fast_parse(argv[1:], options)
+        if args is not None:
+            args.command = argv[0]
+            return handler(args)
 
-    args = parser.parse_args()
+    parser = _build_parser()
+    args = parser.parse_args(argv)
 
     if not args.command:
         parser.print_help()
         return 1
 
-    # Configure logging
-    configure_logging()
-
     # Route to command handler
-    commands = {
-        "run": cmd_run,
-        "resume": cmd_resume,
-        "status": cmd_status,
-        "list": cmd_list,
-    }
-
-    return commands[args.command](args)
+    return _COMMANDS[args.command][0](args)
 
 
 if __name__ == "__main__":
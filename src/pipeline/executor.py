@@ -1,12 +1,18 @@
 """Workflow orchestration and execution."""
 from __future__ import annotations
 
-from datetime import datetime
+import asyncio
+import functools
+import time
+from collections import deque
+from collections.abc import Mapping, Sequence
 from pathlib import Path
+from types import MappingProxyType
+from typing import NamedTuple
 
-import structlog
-
+from . import get_logger
 from .models import (
+    StepDefinition,
     WorkflowDefinition,
     WorkflowState,
     StepResult,
@@ -14,16 +20,39 @@ from .models import (
     WorkspaceInfo,
 )
 from .state import save_state, load_state
-from .agents.base import AgentExecutor
+from .agents.base import AgentExecutor, _completed_at, _now
 from .agents.mock import MockAgentExecutor
 from .agents.claude_code import ClaudeCodeExecutor
 
-logger = structlog.get_logger()
+logger = get_logger()
+
+
+# Hashable summary of a workflow's graph: ((step_id, depends_on), ...)
+_GraphSignature = tuple[tuple[str, tuple[str, ...]], ...]
+
+
+def _graph_signature(workflow: WorkflowDefinition) -> _GraphSignature:
+    """Get the hashable dependency signature of a workflow."""
+    return tuple((step.id, step.depends_on) for step in workflow.steps)
+
+
+def _build_dependents(signature: _GraphSignature) -> dict[str, list[str]]:
+    """Map each step in a graph signature to the steps that depend on it."""
+    adjacency = {step_id: [] for step_id, _ in signature}
+
+    for step_id, depends_on in signature:
+        for dep in depends_on:
+            adjacency[dep].append(step_id)
+
+    return adjacency
 
 
 def resolve_execution_order(workflow: WorkflowDefinition) -> list[str]:
     """Resolve step execution order using topological sort.
 
+    The order is computed once when the workflow is validated, so this is
+    a lookup.
+
     Args:
         workflow: Workflow definition
 
@@ -33,44 +62,153 @@ def resolve_execution_order(workflow: WorkflowDefinition) -> list[str]:
     Raises:
         ValueError: If circular dependency detected
     """
-    from collections import deque
+    _check_acyclic(workflow)
+    result = list(workflow._execution_order)
+    logger.debug("execution_order_resolved", order=result)
+    return result
 
-    # Build dependency graph
-    in_degree = {step.id: 0 for step in workflow.steps}
-    adjacency = {step.id: [] for step in workflow.steps}
 
-    for step in workflow.steps:
-        for dep in step.depends_on:
-            adjacency[dep].append(step.id)
-            in_degree[step.id] += 1
+def _check_acyclic(workflow: WorkflowDefinition):
+    """Raise ValueError if the workflow has a circular dependency."""
+    if workflow._cycle:
+        raise ValueError(f"Circular dependency detected: {' -> '.join(workflow._cycle)}")
 
-    # Kahn's algorithm for topological sort
-    queue = deque([step_id for step_id, degree in in_degree.items() if degree == 0])
-    result = []
 
-    while queue:
-        step_id = queue.popleft()
-        result.append(step_id)
+class ExecutionPlan(NamedTuple):
+    """Scheduling data for a workflow's dependency graph.
 
-        for neighbor in adjacency[step_id]:
-            in_degree[neighbor] -= 1
-            if in_degree[neighbor] == 0:
-                queue.append(neighbor)
+    Computed once per distinct graph (see compile_plan()) and shared, so
+    its mappings are read-only.
 
-    # Check for cycles
-    if len(result) != len(workflow.steps):
-        missing = set(in_degree.keys()) - set(result)
-        raise ValueError(f"Circular dependency detected involving steps: {missing}")
+    The *_at fields describe the same graph indexed by each step's position
+    in order, for use by the scheduler.
+    """
+    order: tuple[str, ...]
+    positions: Mapping[str, int]
+    dependents_at: tuple[tuple[int, ...], ...]
+    dependencies_at: tuple[tuple[int, ...], ...]
+    in_degree_at: tuple[int, ...]
 
-    logger.debug("execution_order_resolved", order=result)
-    return result
+
+def compile_plan(workflow: WorkflowDefinition) -> ExecutionPlan:
+    """Get the execution plan for a workflow.
+
+    Plans are cached by the workflow's step IDs and dependencies, so
+    running or resuming the same workflow again doesn't rebuild its graph.
+
+    Args:
+        workflow: Workflow definition
+
+    Returns:
+        ExecutionPlan for the workflow
+
+    Raises:
+        ValueError: If circular dependency detected
+    """
+    _check_acyclic(workflow)
+    return _compile_cached(_graph_signature(workflow), workflow._execution_order)
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_cached(signature: _GraphSignature, order: tuple[str, ...]) -> ExecutionPlan:
+    """Build an execution plan for a workflow graph (see compile_plan).
+
+    The order is determined by the signature; it is passed in only so it
+    isn't sorted again.
+    """
+    adjacency = _build_dependents(signature)
+    positions = {step_id: position for position, step_id in enumerate(order)}
+    depends_on = dict(signature)
+
+    return ExecutionPlan(
+        order=order,
+        positions=MappingProxyType(positions),
+        dependents_at=tuple(
+            tuple(positions[dependent] for dependent in adjacency[step_id]) for step_id in order
+        ),
+        dependencies_at=tuple(
+            tuple(positions[dep] for dep in depends_on[step_id]) for step_id in order
+        ),
+        in_degree_at=tuple(len(depends_on[step_id]) for step_id in order),
+    )
+
+
+class _StateWriter:
+    """Coalesces state saves requested in quick succession.
+
+    mark_dirty() schedules a save on the running event loop after
+    flush_interval seconds; further requests in the meantime are folded into
+    that one save. flush() saves any pending changes immediately. Saves run
+    on the event loop thread, so at most one is ever in flight.
+
+    A scheduled save that fails can't raise into its caller, so its error is
+    kept and raised by the next mark_dirty() or flush() instead.
+    """
+
+    def __init__(
+        self,
+        state: WorkflowState,
+        workspace: WorkspaceInfo,
+        flush_interval: float,
+        durable: bool = False,
+    ):
+        self._state = state
+        self._workspace = workspace
+        self._flush_interval = flush_interval
+        self._durable = durable
+        self._handle: asyncio.TimerHandle | None = None
+        self._error: Exception | None = None
+
+    def mark_dirty(self):
+        """Request a save of the state."""
+        self._raise_deferred_error()
+        if self._flush_interval <= 0:
+            save_state(self._state, self._workspace, durable=self._durable)
+        elif self._handle is None:
+            loop = asyncio.get_running_loop()
+            self._handle = loop.call_later(self._flush_interval, self._scheduled_flush)
+
+    def flush(self):
+        """Save pending changes now, if there are any."""
+        self._raise_deferred_error()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+            save_state(self._state, self._workspace, durable=self._durable)
+
+    def _scheduled_flush(self):
+        """Timer callback for mark_dirty(): flush, keeping any error to raise later."""
+        try:
+            self.flush()
+        except Exception as e:
+            self._error = e
+
+    def _raise_deferred_error(self):
+        """Raise the error from a failed scheduled save, if there was one."""
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
 
 
 class WorkflowExecutor:
     """Orchestrates workflow execution with state management."""
 
-    def __init__(self):
-        """Initialize executor with agent registry."""
+    def __init__(self, max_workers: int = 1, flush_interval: float = 0.1, durable: bool = False):
+        """Initialize executor with agent registry.
+
+        Args:
+            max_workers: Maximum number of independent steps to run concurrently
+            flush_interval: Seconds to coalesce state saves for while steps
+                are running (0 saves after every step)
+            durable: fsync every state save (survives power loss, at the
+                cost of a disk flush per save)
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+
+        self.max_workers = max_workers
+        self.flush_interval = flush_interval
+        self.durable = durable
         self._agents: dict[str, AgentExecutor] = {
             "mock": MockAgentExecutor(),
             "claude_code": ClaudeCodeExecutor(),
@@ -92,14 +230,46 @@ class WorkflowExecutor:
         workspace: WorkspaceInfo,
         problem_file: Path | None = None,
         context: dict[str, str] | None = None,
+        workflow_path: Path | None = None,
     ) -> WorkflowState:
         """Execute a workflow from start to finish.
 
+        Blocking wrapper around arun().
+
         Args:
             workflow: Workflow definition
             workspace: Workspace for execution
             problem_file: Optional problem file to copy to context
             context: Optional context variables for prompt substitution
+            workflow_path: Optional workflow YAML path, recorded in state so
+                resume can find the workflow again
+
+        Returns:
+            Final workflow state
+        """
+        return asyncio.run(
+            self.arun(workflow, workspace, problem_file, context, workflow_path=workflow_path)
+        )
+
+    async def arun(
+        self,
+        workflow: WorkflowDefinition,
+        workspace: WorkspaceInfo,
+        problem_file: Path | None = None,
+        context: dict[str, str] | None = None,
+        workflow_path: Path | None = None,
+    ) -> WorkflowState:
+        """Execute a workflow from start to finish.
+
+        Independent steps are run concurrently, up to max_workers at a time.
+
+        Args:
+            workflow: Workflow definition
+            workspace: Workspace for execution
+            problem_file: Optional problem file to copy to context
+            context: Optional context variables for prompt substitution
+            workflow_path: Optional workflow YAML path, recorded in state so
+                resume can find the workflow again
 
         Returns:
             Final workflow state
@@ -111,7 +281,8 @@ class WorkflowExecutor:
             workflow_id=workspace.workspace_id,
             workflow_name=workflow.name,
             workspace_path=str(workspace.workspace_path),
-            started_at=datetime.now(),
+            workflow_path=str(workflow_path.resolve()) if workflow_path else None,
+            started_at=_now(),
             problem_file=str(problem_file) if problem_file else None,
         )
 
@@ -123,7 +294,7 @@ class WorkflowExecutor:
 
         # Resolve execution order
         try:
-            execution_order = resolve_execution_order(workflow)
+            plan = compile_plan(workflow)
         except ValueError as e:
             logger.error("workflow_validation_failed", error=str(e))
             raise
@@ -137,51 +308,17 @@ class WorkflowExecutor:
 
         # Initialize step results as pending
         for step in workflow.steps:
-            state.steps[step.id] = StepResult(
-                step_id=step.id,
-                status=StepStatus.PENDING,
-                started_at=datetime.now(),  # Will be updated when actually started
-            )
+            state.steps[step.id] = StepResult(step_id=step.id, status=StepStatus.PENDING)
 
-        save_state(state, workspace)
+        save_state(state, workspace, durable=self.durable)
 
         # Execute steps in order
-        step_map = {step.id: step for step in workflow.steps}
-
-        for step_id in execution_order:
-            step = step_map[step_id]
-
-            # Check dependencies
-            if not self._check_dependencies(step, state):
-                logger.error(
-                    "step_dependencies_failed",
-                    step_id=step_id,
-                    dependencies=step.depends_on,
-                )
-                result = StepResult(
-                    step_id=step_id,
-                    status=StepStatus.FAILED,
-                    started_at=datetime.now(),
-                    completed_at=datetime.now(),
-                    error="Dependencies failed or incomplete",
-                )
-                state.update_step(result)
-                save_state(state, workspace)
-                continue
-
-            # Execute step
-            result = self._execute_step(step, workspace, context)
-            state.update_step(result)
-            save_state(state, workspace)
-
-            # Stop on failure
-            if result.status == StepStatus.FAILED:
-                logger.error("workflow_stopped_on_failure", step_id=step_id)
-                break
+        step_map = workflow.step_map
+        await self._run_steps(plan, plan.order, step_map, workspace, state, context)
 
         # Mark workflow complete
-        state.completed_at = datetime.now()
-        save_state(state, workspace)
+        state.completed_at = _now()
+        save_state(state, workspace, durable=self.durable)
 
         logger.info(
             "workflow_completed",
@@ -201,6 +338,29 @@ class WorkflowExecutor:
     ) -> WorkflowState:
         """Resume a workflow from saved state.
 
+        Blocking wrapper around aresume().
+
+        Args:
+            workflow: Workflow definition
+            workspace: Workspace with saved state
+            context: Optional context variables
+
+        Returns:
+            Updated workflow state
+
+        Raises:
+            ValueError: If no state found or workflow already complete
+        """
+        return asyncio.run(self.aresume(workflow, workspace, context))
+
+    async def aresume(
+        self,
+        workflow: WorkflowDefinition,
+        workspace: WorkspaceInfo,
+        context: dict[str, str] | None = None,
+    ) -> WorkflowState:
+        """Resume a workflow from saved state.
+
         Args:
             workflow: Workflow definition
             workspace: Workspace with saved state
@@ -236,50 +396,34 @@ class WorkflowExecutor:
             logger.debug("reset_completed_at", workflow_id=state.workflow_id)
 
         # Resolve execution order
-        execution_order = resolve_execution_order(workflow)
-        step_map = {step.id: step for step in workflow.steps}
+        plan = compile_plan(workflow)
+        step_map = workflow.step_map
+
+        # Skip completed steps, unless a dependency is incomplete or will be
+        # re-run (e.g. the workflow changed since the state was saved).
+        # Dependencies come first in execution order, so one pass suffices.
+        completed = {
+            step_id for step_id, result in state.steps.items()
+            if result.status == StepStatus.COMPLETED
+        }
+        done: set[str] = set()
+        for step_id in plan.order:
+            if step_id in completed and done.issuperset(step_map[step_id].depends_on):
+                done.add(step_id)
+
+        remaining = [step_id for step_id in plan.order if step_id not in done]
+
+        logger.debug("steps_already_completed", steps=len(done))
+        stale = completed.intersection(remaining)
+        if stale:
+            logger.info("steps_rerun_stale", steps=sorted(stale))
 
         # Execute remaining steps
-        for step_id in execution_order:
-            # Skip completed steps
-            step_result = state.get_step_result(step_id)
-            if step_result and step_result.status == StepStatus.COMPLETED:
-                logger.debug("step_already_completed", step_id=step_id)
-                continue
-
-            step = step_map[step_id]
-
-            # Check dependencies
-            if not self._check_dependencies(step, state):
-                logger.error(
-                    "step_dependencies_failed",
-                    step_id=step_id,
-                    dependencies=step.depends_on,
-                )
-                result = StepResult(
-                    step_id=step_id,
-                    status=StepStatus.FAILED,
-                    started_at=datetime.now(),
-                    completed_at=datetime.now(),
-                    error="Dependencies failed or incomplete",
-                )
-                state.update_step(result)
-                save_state(state, workspace)
-                continue
-
-            # Execute step
-            result = self._execute_step(step, workspace, context)
-            state.update_step(result)
-            save_state(state, workspace)
-
-            # Stop on failure
-            if result.status == StepStatus.FAILED:
-                logger.error("workflow_stopped_on_failure", step_id=step_id)
-                break
+        await self._run_steps(plan, remaining, step_map, workspace, state, context)
 
         # Mark workflow complete
-        state.completed_at = datetime.now()
-        save_state(state, workspace)
+        state.completed_at = _now()
+        save_state(state, workspace, durable=self.durable)
 
         logger.info(
             "workflow_resume_completed",
@@ -289,35 +433,91 @@ class WorkflowExecutor:
 
         return state
 
-    def _check_dependencies(
+    async def _run_steps(
         self,
-        step: StepDefinition,
+        plan: ExecutionPlan,
+        execution_order: Sequence[str],
+        step_map: Mapping[str, StepDefinition],
+        workspace: WorkspaceInfo,
         state: WorkflowState,
-    ) -> bool:
-        """Check if all step dependencies are satisfied.
+        context: dict[str, str],
+    ):
+        """Execute steps as their dependencies finish, saving state as they complete.
 
-        Args:
-            step: Step to check
-            state: Current workflow state
+        A step is started as soon as all of its dependencies have completed,
+        with up to max_workers steps running at once. Once any step fails, no
+        further steps are started; steps already running are allowed to
+        finish and their results are recorded. Saves of results completing
+        within flush_interval of each other are coalesced.
 
-        Returns:
-            True if all dependencies completed successfully
+        Args:
+            plan: Execution plan for the workflow
+            execution_order: Step IDs to execute, in topological order (all of
+                plan.order, or what remains of it on resume)
+            step_map: Step ID -> definition mapping
+            workspace: Workspace
+            state: Workflow state to update
+            context: Context variables
         """
-        for dep_id in step.depends_on:
-            dep_result = state.get_step_result(dep_id)
+        # A step becomes ready once every dependency has completed, so there is
+        # no need to re-check dependency state before starting it. Dependencies
+        # outside execution_order were validated as completed by aresume().
+        # Successors of a failed step are never released and stay PENDING.
+        # Steps are tracked by their position in plan.order.
+        if len(execution_order) == len(plan.order):
+            positions = range(len(plan.order))
+            in_degree = list(plan.in_degree_at)
+        else:
+            positions = [plan.positions[step_id] for step_id in execution_order]
+            pending = bytearray(len(plan.order))
+            for position in positions:
+                pending[position] = 1
+            in_degree = [0] * len(plan.order)
+            for position in positions:
+                in_degree[position] = sum(pending[dep] for dep in plan.dependencies_at[position])
+
+        # Ready steps are kept in execution order, so with max_workers=1 steps
+        # run in topological order
+        ready = deque(position for position in positions if in_degree[position] == 0)
+        running: dict[asyncio.Task, int] = {}
+        stopped = False
+        writer = _StateWriter(state, workspace, self.flush_interval, self.durable)
+
+        def release(position: int):
+            # Dependents of a pending step are always pending themselves
+            for dependent in plan.dependents_at[position]:
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    ready.append(dependent)
 
-            if dep_result is None or dep_result.status != StepStatus.COMPLETED:
-                logger.warning(
-                    "dependency_not_satisfied",
-                    step_id=step.id,
-                    dependency=dep_id,
-                    status=dep_result.status if dep_result else "not_started",
-                )
-                return False
-
-        return True
-
-    def _execute_step(
+        try:
+            while running or (ready and not stopped):
+                # Start ready steps up to the worker limit
+                while ready and not stopped and len(running) < self.max_workers:
+                    position = ready.popleft()
+                    step = step_map[plan.order[position]]
+                    task = asyncio.create_task(self._execute_step(step, workspace, context))
+                    running[task] = position
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    position = running.pop(task)
+                    result = task.result()
+                    state.update_step(result)
+                    writer.mark_dirty()
+
+                    # Stop on failure
+                    if result.status == StepStatus.FAILED:
+                        logger.error("workflow_stopped_on_failure", step_id=result.step_id)
+                        stopped = True
+                    else:
+                        release(position)
+        finally:
+            # Never leave finished steps unsaved, even if interrupted
+            writer.flush()
+
+    async def _execute_step(
         self,
         step: StepDefinition,
         workspace: WorkspaceInfo,
@@ -345,25 +545,54 @@ class WorkflowExecutor:
 
         if agent is None:
             logger.error("unknown_agent", wrapper=step.wrapper, step_id=step.id)
+            now = _now()
             return StepResult(
                 step_id=step.id,
                 status=StepStatus.FAILED,
-                started_at=datetime.now(),
-                completed_at=datetime.now(),
+                started_at=now,
+                completed_at=now,
                 error=f"Unknown agent wrapper: {step.wrapper}",
             )
 
         # Execute step
+        started_at = _now()
+        start_ns = time.monotonic_ns()
         try:
-            result = agent.execute_step(step, workspace, context)
-            return result
-
+            result = await agent.aexecute_step(step, workspace, context)
         except Exception as e:
             logger.error("step_execution_error", step_id=step.id, error=str(e))
             return StepResult(
                 step_id=step.id,
                 status=StepStatus.FAILED,
-                started_at=datetime.now(),
-                completed_at=datetime.now(),
+                started_at=started_at,
+                completed_at=_completed_at(started_at, start_ns),
                 error=f"Execution error: {e}",
             )
+
+        if result.agent_output is not None:
+            self._store_agent_output(result, workspace)
+
+        return result
+
+    def _store_agent_output(self, result: StepResult, workspace: WorkspaceInfo):
+        """Move raw agent output into the logs directory.
+
+        Agent output can be large, and keeping it out of the state keeps
+        every checkpoint small. It remains available via
+        StepResult.load_agent_output().
+
+        Args:
+            result: Step result; agent_output is replaced by agent_output_path
+            workspace: Workspace whose logs directory receives the output
+        """
+        output_path = workspace.logs_dir / f"{result.step_id}.output.txt"
+
+        try:
+            output_path.write_text(result.agent_output)
+        except OSError as e:
+            # Keep the output inline rather than lose it
+            logger.warning("agent_output_write_failed", step_id=result.step_id, error=str(e))
+            return
+
+        result.agent_output_path = str(output_path)
+        result.agent_output = None
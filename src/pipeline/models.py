@@ -1,10 +1,15 @@
 """Pydantic models for workflow definitions and runtime state."""
+from collections import deque
+from collections.abc import Mapping
+from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
+from functools import cached_property
 from pathlib import Path
+from types import MappingProxyType
 from typing import Any
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator, model_validator
 
 
 class ModelName(str, Enum):
@@ -25,18 +30,21 @@ class StepStatus(str, Enum):
 
 class StepDefinition(BaseModel):
     """Definition of a single workflow step from YAML."""
+    # Immutable once parsed, so derived data (e.g. execution order) can be cached
+    model_config = ConfigDict(frozen=True)
+
     id: str = Field(..., description="Unique step identifier")
     model: ModelName = Field(..., description="Claude model to use")
     wrapper: str = Field(default="claude_code", description="Agent wrapper type")
     prompt_strategy: str = Field(..., description="Path to prompt template file")
-    outputs: list[str] = Field(default_factory=list, description="Expected output files (workspace-relative)")
-    depends_on: list[str] = Field(default_factory=list, description="Step IDs this step depends on")
+    outputs: tuple[str, ...] = Field(default=(), description="Expected output files (workspace-relative)")
+    depends_on: tuple[str, ...] = Field(default=(), description="Step IDs this step depends on")
     timeout: int = Field(default=300, description="Timeout in seconds")
     max_turns: int = Field(default=10, description="Max agent turns")
 
     @field_validator("outputs")
     @classmethod
-    def validate_outputs(cls, v: list[str]) -> list[str]:
+    def validate_outputs(cls, v: tuple[str, ...]) -> tuple[str, ...]:
         """Ensure output paths don't start with /."""
         for path in v:
             if path.startswith("/"):
@@ -44,15 +52,79 @@ class StepDefinition(BaseModel):
         return v
 
 
+def _topological_sort(steps: tuple[StepDefinition, ...]) -> tuple[tuple[str, ...], list[str] | None]:
+    """Order steps so every step comes after its dependencies.
+
+    Uses Kahn's algorithm. Steps left over are on a cycle or depend on one;
+    one such cycle is returned alongside the partial order.
+
+    Args:
+        steps: Steps whose dependencies all exist
+
+    Returns:
+        Tuple of (step IDs in execution order, closed cycle path or None)
+    """
+    unresolved = {step.id: 0 for step in steps}
+    dependents: dict[str, list[str]] = {step.id: [] for step in steps}
+    for step in steps:
+        for dep in step.depends_on:
+            unresolved[step.id] += 1
+            dependents[dep].append(step.id)
+
+    queue = deque(step_id for step_id, count in unresolved.items() if count == 0)
+    order = []
+    while queue:
+        step_id = queue.popleft()
+        order.append(step_id)
+        for dependent in dependents[step_id]:
+            unresolved[dependent] -= 1
+            if unresolved[dependent] == 0:
+                queue.append(dependent)
+
+    if len(order) == len(steps):
+        return tuple(order), None
+
+    # Every remaining step has a dependency that also remains, so following
+    # those dependencies from any of them must revisit a step
+    remaining = {step_id for step_id, count in unresolved.items() if count > 0}
+    depends_on = {step.id: step.depends_on for step in steps}
+    depth: dict[str, int] = {}
+    path: list[str] = []
+    node = next(step.id for step in steps if step.id in remaining)
+
+    while node not in depth:
+        depth[node] = len(path)
+        path.append(node)
+        node = next(dep for dep in depends_on[node] if dep in remaining)
+
+    return tuple(order), path[depth[node]:] + [node]
+
+
 class WorkflowDefinition(BaseModel):
-    """Complete workflow definition parsed from YAML."""
+    """Complete workflow definition parsed from YAML.
+
+    Immutable, like its steps: the execution order is computed once during
+    validation, and parsed workflows are shared between callers.
+    """
+    model_config = ConfigDict(frozen=True)
+
     name: str = Field(..., description="Workflow name")
     description: str = Field(default="", description="Workflow description")
-    steps: list[StepDefinition] = Field(..., description="Workflow steps")
+    steps: tuple[StepDefinition, ...] = Field(..., description="Workflow steps")
+
+    # Set by the validator; a cycle is reported by validate_workflow() and
+    # rejected when the workflow is executed, not when it is parsed
+    _execution_order: tuple[str, ...] = PrivateAttr(default=())
+    _cycle: list[str] | None = PrivateAttr(default=None)
+
+    @cached_property
+    def step_map(self) -> Mapping[str, StepDefinition]:
+        """Step ID -> definition mapping (built on first access, read-only)."""
+        return MappingProxyType({step.id: step for step in self.steps})
 
     @field_validator("steps")
     @classmethod
-    def validate_steps(cls, v: list[StepDefinition]) -> list[StepDefinition]:
+    def validate_steps(cls, v: tuple[StepDefinition, ...]) -> tuple[StepDefinition, ...]:
         """Validate step IDs are unique and dependencies exist."""
         step_ids = {step.id for step in v}
         if len(step_ids) != len(v):
@@ -65,31 +137,52 @@ class WorkflowDefinition(BaseModel):
 
         return v
 
+    @model_validator(mode="after")
+    def resolve_order(self) -> "WorkflowDefinition":
+        """Sort the steps topologically, once per workflow."""
+        self._execution_order, self._cycle = _topological_sort(self.steps)
+        return self
+
 
 class StepResult(BaseModel):
     """Result from executing a workflow step."""
     step_id: str
     status: StepStatus
-    started_at: datetime
+    started_at: datetime | None = Field(default=None, description="When the step started (None until it does)")
     completed_at: datetime | None = None
     outputs: dict[str, str] = Field(default_factory=dict, description="Output file paths and content hashes")
     tokens_used: int = Field(default=0)
     error: str | None = None
     agent_output: str | None = Field(default=None, description="Raw agent output for debugging")
+    agent_output_path: str | None = Field(
+        default=None,
+        description="File holding the raw agent output (kept out of saved state)",
+    )
 
     @property
     def duration_seconds(self) -> float | None:
         """Calculate step duration."""
-        if self.completed_at:
+        if self.started_at and self.completed_at:
             return (self.completed_at - self.started_at).total_seconds()
         return None
 
+    def load_agent_output(self) -> str | None:
+        """Get the raw agent output, reading it from agent_output_path if needed."""
+        if self.agent_output is not None or self.agent_output_path is None:
+            return self.agent_output
+
+        try:
+            return Path(self.agent_output_path).read_text()
+        except FileNotFoundError:
+            return None
+
 
 class WorkflowState(BaseModel):
     """Runtime state of a workflow execution."""
     workflow_id: str = Field(..., description="Unique workflow execution ID (build number)")
     workflow_name: str
     workspace_path: str
+    workflow_path: str | None = Field(default=None, description="Absolute path to the workflow YAML file")
     problem_file: str | None = None
 
     started_at: datetime
@@ -100,6 +193,13 @@ class WorkflowState(BaseModel):
 
     total_tokens: int = 0
 
+    # Checkpoint bookkeeping for save_state(); not serialized
+    _base_path: str | None = PrivateAttr(default=None)
+    _delta_count: int = PrivateAttr(default=0)
+    _dirty_steps: set[str] = PrivateAttr(default_factory=set)
+    # Output paths repeat across steps; share one string object per path
+    _str_pool: dict[str, str] = PrivateAttr(default_factory=dict)
+
     @property
     def is_complete(self) -> bool:
         """Check if workflow is complete (all steps completed or failed)."""
@@ -130,9 +230,20 @@ class WorkflowState(BaseModel):
         """Get result for a specific step."""
         return self.steps.get(step_id)
 
+    def _intern_outputs(self, result: StepResult):
+        """Replace a result's output paths and hashes with pooled copies."""
+        if result.outputs:
+            pool = self._str_pool
+            result.outputs = {
+                pool.setdefault(path, path): pool.setdefault(digest, digest)
+                for path, digest in result.outputs.items()
+            }
+
     def update_step(self, result: StepResult):
         """Update or add a step result."""
+        self._intern_outputs(result)
         self.steps[result.step_id] = result
+        self._dirty_steps.add(result.step_id)
         if result.status == StepStatus.IN_PROGRESS:
             self.current_step = result.step_id
         elif result.status in [StepStatus.COMPLETED, StepStatus.FAILED]:
@@ -143,27 +254,53 @@ class WorkflowState(BaseModel):
         self.total_tokens += result.tokens_used
 
 
-class WorkspaceInfo(BaseModel):
-    """Metadata about a workspace."""
+@dataclass(frozen=True)
+class WorkspaceInfo:
+    """Metadata about a workspace.
+
+    A plain dataclass rather than a Pydantic model: it is only ever built
+    from paths on disk, so it needs no validation or serialization.
+    Subdirectory paths are derived on first access, so listing workspaces
+    doesn't build paths that are never used.
+    """
     workspace_id: str
     workspace_path: Path
     created_at: datetime
 
     # Directory structure
-    project_dir: Path
-    context_dir: Path
-    state_dir: Path
-    logs_dir: Path
+    @cached_property
+    def project_dir(self) -> Path:
+        """Working directory for code."""
+        return self.workspace_path / "project"
+
+    @cached_property
+    def context_dir(self) -> Path:
+        """Problem descriptions and clarifications."""
+        return self.workspace_path / "context"
+
+    @cached_property
+    def state_dir(self) -> Path:
+        """Workflow state files."""
+        return self.workspace_path / "state"
+
+    @cached_property
+    def logs_dir(self) -> Path:
+        """Execution logs."""
+        return self.workspace_path / "logs"
 
     @classmethod
-    def from_path(cls, workspace_path: Path) -> "WorkspaceInfo":
-        """Create WorkspaceInfo from a workspace path."""
+    def from_path(cls, workspace_path: Path, created_at: datetime | None = None) -> "WorkspaceInfo":
+        """Create WorkspaceInfo from a workspace path.
+
+        Args:
+            workspace_path: Path to the workspace directory
+            created_at: Creation time, if already known (avoids a stat call)
+        """
+        if created_at is None:
+            created_at = datetime.fromtimestamp(workspace_path.stat().st_ctime)
+
         return cls(
             workspace_id=workspace_path.name,
             workspace_path=workspace_path,
-            created_at=datetime.fromtimestamp(workspace_path.stat().st_ctime),
-            project_dir=workspace_path / "project",
-            context_dir=workspace_path / "context",
-            state_dir=workspace_path / "state",
-            logs_dir=workspace_path / "logs",
+            created_at=created_at,
         )
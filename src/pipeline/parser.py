@@ -1,17 +1,40 @@
 """YAML workflow parser."""
+import functools
+import hashlib
+import os
 from pathlib import Path
 
 import yaml
-import structlog
 
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:  # pragma: no cover - PyYAML built without libyaml
+    from yaml import SafeLoader as _SafeLoader
+
+from . import __version__, get_logger
 from .models import WorkflowDefinition, StepDefinition
 
-logger = structlog.get_logger()
+logger = get_logger()
+
+
+def _workflow_cache_dir() -> Path:
+    """Get the directory for cached parsed workflows.
+
+    Uses PIPELINE_CACHE_DIR if set, otherwise the XDG cache directory.
+    """
+    if "PIPELINE_CACHE_DIR" in os.environ:
+        base = Path(os.environ["PIPELINE_CACHE_DIR"])
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "pipeline"
+    return base / "workflows"
 
 
 def parse_workflow(yaml_path: str | Path) -> WorkflowDefinition:
     """Parse a workflow definition from YAML file.
 
+    Parsed workflows are cached in-process and on disk, keyed by the file's
+    path, mtime and size, so unchanged files skip YAML parsing entirely.
+
     Args:
         yaml_path: Path to YAML workflow file
 
@@ -25,16 +48,77 @@ def parse_workflow(yaml_path: str | Path) -> WorkflowDefinition:
     """
     yaml_path = Path(yaml_path)
 
-    if not yaml_path.exists():
-        raise FileNotFoundError(f"Workflow file not found: {yaml_path}")
+    try:
+        st = yaml_path.stat()
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Workflow file not found: {yaml_path}") from None
+
+    workflow = _parse_workflow_cached(str(yaml_path.resolve()), st.st_mtime_ns, st.st_size)
+
+    logger.info(
+        "workflow_parsed",
+        name=workflow.name,
+        steps=len(workflow.steps),
+        path=str(yaml_path),
+    )
+
+    return workflow
+
+
+@functools.lru_cache(maxsize=32)
+def _parse_workflow_cached(path: str, mtime_ns: int, size: int) -> WorkflowDefinition:
+    """Parse a workflow, consulting the on-disk cache first.
+
+    Args:
+        path: Absolute path to YAML workflow file
+        mtime_ns: Modification time in nanoseconds (part of cache key)
+        size: File size in bytes (part of cache key)
+
+    Returns:
+        Validated WorkflowDefinition
+    """
+    key = hashlib.sha256(f"{__version__}\0{path}\0{mtime_ns}\0{size}".encode()).hexdigest()
+    cache_file = _workflow_cache_dir() / f"{key}.json"
+
+    try:
+        workflow = WorkflowDefinition.model_validate_json(cache_file.read_bytes())
+        logger.debug("workflow_cache_hit", path=path)
+        return workflow
+    except (OSError, ValueError):
+        pass
+
+    workflow = _load_workflow_yaml(Path(path))
 
+    # Best effort: an unwritable cache directory just means no disk cache
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        temp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        temp_file.write_text(workflow.model_dump_json())
+        temp_file.replace(cache_file)
+    except OSError as e:
+        logger.debug("workflow_cache_write_failed", path=path, error=str(e))
+
+    return workflow
+
+
+def _load_workflow_yaml(yaml_path: Path) -> WorkflowDefinition:
+    """Parse and validate a workflow YAML file without caching.
+
+    Args:
+        yaml_path: Path to YAML workflow file
+
+    Returns:
+        Validated WorkflowDefinition
+
+    Raises:
+        ValueError: If YAML is invalid or validation fails
+    """
     logger.debug("parsing_workflow", path=str(yaml_path))
 
-    with open(yaml_path, "r") as f:
-        try:
-            data = yaml.safe_load(f)
-        except yaml.YAMLError as e:
-            raise ValueError(f"Invalid YAML syntax: {e}")
+    try:
+        data = yaml.load(yaml_path.read_bytes(), Loader=_SafeLoader)
+    except yaml.YAMLError as e:
+        raise ValueError(f"Invalid YAML syntax: {e}")
 
     if not isinstance(data, dict):
         raise ValueError("YAML must contain a dictionary at root level")
@@ -50,61 +134,22 @@ def parse_workflow(yaml_path: str | Path) -> WorkflowDefinition:
     except Exception as e:
         raise ValueError(f"Workflow validation failed: {e}")
 
-    logger.info(
-        "workflow_parsed",
-        name=workflow.name,
-        steps=len(workflow.steps),
-        path=str(yaml_path),
-    )
-
     return workflow
 
 
 def detect_cycles(workflow: WorkflowDefinition) -> list[str] | None:
     """Detect circular dependencies in workflow steps.
 
+    Cycles are found while the workflow is validated, so this is a lookup.
+
     Args:
         workflow: Workflow to check
 
     Returns:
         List of step IDs forming a cycle, or None if no cycles exist
     """
-    # Build adjacency list
-    graph: dict[str, list[str]] = {step.id: step.depends_on for step in workflow.steps}
-
-    # Track visited nodes and recursion stack
-    visited: set[str] = set()
-    rec_stack: set[str] = set()
-    path: list[str] = []
-
-    def dfs(node: str) -> list[str] | None:
-        """DFS to detect cycles."""
-        visited.add(node)
-        rec_stack.add(node)
-        path.append(node)
-
-        for neighbor in graph.get(node, []):
-            if neighbor not in visited:
-                cycle = dfs(neighbor)
-                if cycle:
-                    return cycle
-            elif neighbor in rec_stack:
-                # Found a cycle
-                cycle_start = path.index(neighbor)
-                return path[cycle_start:] + [neighbor]
-
-        path.pop()
-        rec_stack.remove(node)
-        return None
-
-    # Check all nodes
-    for step_id in graph:
-        if step_id not in visited:
-            cycle = dfs(step_id)
-            if cycle:
-                return cycle
-
-    return None
+    cycle = workflow._cycle
+    return list(cycle) if cycle else None
 
 
 def validate_workflow(workflow: WorkflowDefinition) -> tuple[bool, list[str]]:
@@ -123,9 +168,24 @@ def validate_workflow(workflow: WorkflowDefinition) -> tuple[bool, list[str]]:
     if cycle:
         errors.append(f"Circular dependency detected: {' -> '.join(cycle)}")
 
-    # Validate prompt files exist
+    # Validate prompt files exist. Steps usually share a prompts directory,
+    # so list each directory once instead of stat'ing every file.
+    listings: dict[Path, set[str] | None] = {}
     for step in workflow.steps:
         prompt_path = Path(step.prompt_strategy)
+        parent = prompt_path.parent
+
+        if parent not in listings:
+            try:
+                listings[parent] = set(os.listdir(parent))
+            except OSError:
+                listings[parent] = None
+
+        names = listings[parent]
+        if names is not None and prompt_path.name in names:
+            continue
+
+        # Confirm misses individually (e.g. case-insensitive filesystems)
         if not prompt_path.exists():
             errors.append(f"Prompt file not found for step '{step.id}': {prompt_path}")
 
@@ -1,50 +1,185 @@
 """State persistence for workflow executions."""
-import json
+import os
+from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-import structlog
+from pydantic import BaseModel
 
-from .models import WorkflowState, WorkspaceInfo
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional speedup
+    zstandard = None
 
-logger = structlog.get_logger()
+from . import get_logger
+from .models import StepResult, WorkflowState, WorkspaceInfo
+
+logger = get_logger()
 
 STATE_FILENAME = "workflow_state.json"
+COMPRESSED_STATE_FILENAME = "workflow_state.json.zst"
+DELTAS_FILENAME = "workflow_state.deltas.jsonl"
+
+# Rewrite the base state file after this many appended deltas
+COMPACT_EVERY = 32
+
+# Base state files at least this large are zstd-compressed (if zstandard is
+# installed) and saved as COMPRESSED_STATE_FILENAME; smaller ones stay plain
+# JSON so they can be read directly. A workflow of a few dozen steps with
+# hashed outputs reaches this size.
+COMPRESS_THRESHOLD = 64 * 1024
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+class _StateDelta(BaseModel):
+    """One appended checkpoint: changed step results plus workflow counters."""
+    current_step: str | None
+    total_tokens: int
+    completed_at: datetime | None
+    steps: dict[str, StepResult]
 
 
-def save_state(state: WorkflowState, workspace: WorkspaceInfo):
-    """Save workflow state to disk with atomic write.
+def save_state(
+    state: WorkflowState,
+    workspace: WorkspaceInfo,
+    indent: int | None = None,
+    durable: bool = False,
+):
+    """Save workflow state to disk.
 
     Args:
         state: Workflow state to save
         workspace: Workspace containing state directory
-
-    The state is written to a temporary file first, then atomically renamed
-    to ensure we never have a partially written state file.
+        indent: Optional indentation for the base file (compact by default;
+            pipe it through `python -m json.tool` to read it)
+        durable: fsync written data and directory entries before returning,
+            so the checkpoint survives a power loss, not just a crash
+
+    The first save of a state writes the full base file. Later saves append
+    only the step results changed through update_step() to a delta log, so
+    each save costs O(changed steps) rather than O(state). The base is
+    rewritten (compacting the log) every COMPACT_EVERY deltas and once the
+    workflow completes.
+
+    The base file is written to a temporary file first, then atomically
+    renamed, so it is never partially written. A torn final delta line is
+    ignored on load. Without durable, recently saved data may still be in
+    the OS page cache when save_state returns.
     """
-    state_path = workspace.state_dir / STATE_FILENAME
-    temp_path = workspace.state_dir / f"{STATE_FILENAME}.tmp"
-
-    # Serialize to JSON using Pydantic
-    state_json = state.model_dump_json(indent=2)
+    state_dir = workspace.state_dir
+    deltas_path = state_dir / DELTAS_FILENAME
+
+    if (
+        state._base_path is None
+        or Path(state._base_path).parent != state_dir
+        or state._delta_count >= COMPACT_EVERY
+        or state.completed_at is not None
+    ):
+        _write_base(state, state_dir, deltas_path, indent, durable)
+    else:
+        delta = _StateDelta(
+            current_step=state.current_step,
+            total_tokens=state.total_tokens,
+            completed_at=state.completed_at,
+            steps={step_id: state.steps[step_id] for step_id in state._dirty_steps},
+        )
 
-    # Write to temp file
-    temp_path.write_text(state_json)
+        # One write per record, so a crash can only tear the last line
+        with open(deltas_path, "ab") as f:
+            f.write(delta.model_dump_json().encode() + b"\n")
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
 
-    # Atomic rename
-    temp_path.replace(state_path)
+        state._delta_count += 1
 
+    # Report the steps just saved: counting completed ones would walk every
+    # step, making each save O(state) again
     logger.debug(
         "state_saved",
         workspace_id=workspace.workspace_id,
         current_step=state.current_step,
-        completed_steps=len(state.completed_steps),
+        changed_steps=len(state._dirty_steps),
+        deltas=state._delta_count,
     )
 
+    state._dirty_steps.clear()
+
+
+def _write_base(
+    state: WorkflowState,
+    state_dir: Path,
+    deltas_path: Path,
+    indent: int | None = None,
+    durable: bool = False,
+):
+    """Write the full state file and discard the delta log it supersedes."""
+    # Serialize to JSON using Pydantic (compact unless an indent is requested)
+    payload = state.model_dump_json(indent=indent).encode()
+    if zstandard is not None and len(payload) >= COMPRESS_THRESHOLD:
+        payload = zstandard.ZstdCompressor(level=3).compress(payload)
+        name, other_name = COMPRESSED_STATE_FILENAME, STATE_FILENAME
+    else:
+        name, other_name = STATE_FILENAME, COMPRESSED_STATE_FILENAME
+
+    state_path = state_dir / name
+    temp_path = state_dir / f"{name}.tmp"
+
+    with open(temp_path, "wb") as f:
+        f.write(payload)
+        if durable:
+            f.flush()
+            os.fsync(f.fileno())
+
+    # Drop the old deltas before the new base lands, so they can never be
+    # replayed over it. A crash in between leaves the previous base, which is
+    # an older but consistent checkpoint.
+    deltas_path.unlink(missing_ok=True)
+    if durable:
+        _fsync_dir(state_path.parent)
+
+    # Atomic rename
+    os.replace(temp_path, state_path)
+    if durable:
+        _fsync_dir(state_path.parent)
+
+    # The state may have just crossed COMPRESS_THRESHOLD. Should this unlink
+    # be lost, loading picks the newer of the two files.
+    (state_dir / other_name).unlink(missing_ok=True)
+
+    state._base_path = str(state_path)
+    state._delta_count = 0
+
+
+def _fsync_dir(path: Path):
+    """Flush a directory's entries (creates, renames, unlinks) to disk."""
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _find_base(state_dir: Path) -> Path | None:
+    """Get the base state file in a state directory, plain or compressed."""
+    found = []
+    for name in (STATE_FILENAME, COMPRESSED_STATE_FILENAME):
+        path = state_dir / name
+        try:
+            found.append((path.stat().st_mtime_ns, path))
+        except FileNotFoundError:
+            pass
+
+    # Both exist only if a save was interrupted; the newer one is current
+    return max(found)[1] if found else None
+
 
 def load_state(workspace: WorkspaceInfo) -> WorkflowState | None:
     """Load workflow state from disk.
 
+    Reads the base state file (STATE_FILENAME, or COMPRESSED_STATE_FILENAME
+    for large states) and replays any appended deltas.
+
     Args:
         workspace: Workspace to load state from
 
@@ -54,28 +189,73 @@ def load_state(workspace: WorkspaceInfo) -> WorkflowState | None:
     Raises:
         ValueError: If state file is corrupted or invalid
     """
-    state_path = workspace.state_dir / STATE_FILENAME
+    state_path = _find_base(workspace.state_dir)
 
-    if not state_path.exists():
+    if state_path is None:
         logger.debug("no_state_found", workspace_id=workspace.workspace_id)
         return None
 
     try:
-        state_json = state_path.read_text()
-        state_dict = json.loads(state_json)
-        state = WorkflowState(**state_dict)
+        payload = state_path.read_bytes()
+
+        # Large states are zstd-compressed; detect by magic bytes, which also
+        # covers compressed states saved under the plain name
+        if payload.startswith(_ZSTD_MAGIC):
+            if zstandard is None:
+                raise ValueError("state is zstd-compressed but zstandard is not installed")
+            try:
+                payload = zstandard.ZstdDecompressor().decompress(payload)
+            except zstandard.ZstdError as e:
+                raise ValueError(f"corrupt zstd-compressed state: {e}")
+
+        # Parse and validate in one pass, without an intermediate dict
+        state = WorkflowState.model_validate_json(payload)
+
+    except ValueError as e:
+        raise ValueError(f"Failed to load state from {state_path}: {e}")
 
-        logger.debug(
-            "state_loaded",
-            workspace_id=workspace.workspace_id,
-            current_step=state.current_step,
-            completed_steps=len(state.completed_steps),
-        )
+    deltas_path = workspace.state_dir / DELTAS_FILENAME
+
+    try:
+        lines = deltas_path.read_bytes().split(b"\n")
+    except FileNotFoundError:
+        lines = [b""]
+
+    # Only newline-terminated records are complete; anything after the last
+    # newline is a torn write
+    *records, torn = lines
+
+    for line_number, line in enumerate(records, start=1):
+        try:
+            delta = _StateDelta.model_validate_json(line)
+        except ValueError as e:
+            raise ValueError(f"Failed to load state delta {line_number} from {deltas_path}: {e}")
+
+        state.steps.update(delta.steps)
+        state.current_step = delta.current_step
+        state.total_tokens = delta.total_tokens
+        state.completed_at = delta.completed_at
+
+    for result in state.steps.values():
+        state._intern_outputs(result)
+
+    if torn:
+        # Rewrite the base on the next save rather than appending after the
+        # torn record
+        logger.warning("state_delta_torn", workspace_id=workspace.workspace_id)
+    else:
+        state._base_path = str(state_path)
+        state._delta_count = len(records)
 
-        return state
+    logger.debug(
+        "state_loaded",
+        workspace_id=workspace.workspace_id,
+        current_step=state.current_step,
+        completed_steps=len(state.completed_steps),
+        deltas=len(records),
+    )
 
-    except (json.JSONDecodeError, ValueError) as e:
-        raise ValueError(f"Failed to load state from {state_path}: {e}")
+    return state
 
 
 def can_resume(workspace: WorkspaceInfo) -> bool:
@@ -115,18 +295,16 @@ def create_backup(workspace: WorkspaceInfo) -> Path:
     Raises:
         FileNotFoundError: If no state file exists
     """
-    state_path = workspace.state_dir / STATE_FILENAME
+    state = load_state(workspace)
 
-    if not state_path.exists():
+    if state is None:
         raise FileNotFoundError(f"No state file to backup in {workspace.workspace_id}")
 
-    # Create backup with timestamp
-    from datetime import datetime
+    # Create backup with timestamp; deltas are folded in so the backup is a
+    # single self-contained file
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     backup_path = workspace.state_dir / f"workflow_state_{timestamp}.json.bak"
-
-    import shutil
-    shutil.copy2(state_path, backup_path)
+    backup_path.write_text(state.model_dump_json(indent=2))
 
     logger.info("state_backup_created", workspace_id=workspace.workspace_id, backup=str(backup_path))
 
@@ -142,8 +320,6 @@ def get_state_summary(state: WorkflowState) -> dict[str, Any]:
     Returns:
         Dictionary with human-readable summary
     """
-    from datetime import datetime
-
     duration = None
     if state.completed_at:
         duration = (state.completed_at - state.started_at).total_seconds()
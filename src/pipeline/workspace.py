@@ -1,17 +1,47 @@
 """Workspace management for pipeline executions."""
+import errno
+import logging
+import os
 import shutil
+import stat
+from collections.abc import Iterator
 from datetime import datetime
 from pathlib import Path
 
-import structlog
-
+from . import get_logger, log_enabled_for
 from .models import WorkspaceInfo
 
-logger = structlog.get_logger()
+logger = get_logger()
 
 # Default base directory for all workspaces
 WORKSPACES_BASE = Path("workspaces")
 
+# Subdirectories created in every workspace (see WorkspaceInfo)
+WORKSPACE_SUBDIRS = ("project", "context", "state", "logs")
+
+# Subdirectories are created through a directory descriptor; O_PATH (Linux)
+# opens it as a reference only, without checking read permission
+_DIR_FD_FLAGS = os.O_DIRECTORY | getattr(os, "O_PATH", os.O_RDONLY)
+
+
+def _prefix(base_dir: Path) -> str:
+    """Get base_dir as a string ending in a separator.
+
+    Workspace paths are then a plain concatenation, prefix + workspace_id.
+    """
+    base = os.fspath(base_dir)
+    return base if base.endswith(os.sep) else base + os.sep
+
+
+# Prefix for the default base, computed once. Not resolved to an absolute
+# path: the default is relative to the current directory.
+_WORKSPACES_BASE_PREFIX = _prefix(WORKSPACES_BASE)
+
+
+def _base_prefix(base_dir: Path) -> str:
+    """Get the path prefix for base_dir, reusing the precomputed default."""
+    return _WORKSPACES_BASE_PREFIX if base_dir is WORKSPACES_BASE else _prefix(base_dir)
+
 
 def get_next_build_number(base_dir: Path = WORKSPACES_BASE) -> int:
     """Get the next available build number.
@@ -22,15 +52,28 @@ def get_next_build_number(base_dir: Path = WORKSPACES_BASE) -> int:
     Returns:
         Next build number (1 if no workspaces exist)
     """
-    if not base_dir.exists():
+    prefix = _base_prefix(base_dir)
+    try:
+        names = os.listdir(prefix)
+    except FileNotFoundError:
         return 1
 
-    existing = [
-        int(p.name) for p in base_dir.iterdir()
-        if p.is_dir() and p.name.isdigit()
-    ]
+    # Only the highest number matters, so rather than checking every entry's
+    # type, check candidates from the highest down; normally one lstat
+    candidates = sorted(
+        (name for name in names if name.isdigit()),
+        key=lambda name: (len(name), name),
+        reverse=True,
+    )
+    for name in candidates:
+        try:
+            mode = os.lstat(prefix + name).st_mode
+        except FileNotFoundError:
+            continue  # Deleted since the listing
+        if stat.S_ISDIR(mode):
+            return int(name) + 1
 
-    return max(existing, default=0) + 1
+    return 1
 
 
 def create_workspace(
@@ -46,6 +89,9 @@ def create_workspace(
     Returns:
         WorkspaceInfo with paths to all workspace directories
 
+    Raises:
+        ValueError: If the workspace already exists
+
     Directory structure:
         workspaces/
           {build_number:05d}/
@@ -57,22 +103,48 @@ def create_workspace(
     if build_number is None:
         build_number = get_next_build_number(base_dir)
 
-    workspace_id = f"{build_number:05d}"
-    workspace_path = base_dir / workspace_id
+    workspace_id = str(build_number).zfill(5)
+    workspace_path = Path(_base_prefix(base_dir) + workspace_id)
 
-    if workspace_path.exists():
-        raise ValueError(f"Workspace {workspace_id} already exists")
+    # Create directory structure; mkdir() fails atomically if it exists
+    try:
+        workspace_path.mkdir(parents=True)
+    except FileExistsError:
+        raise ValueError(f"Workspace {workspace_id} already exists") from None
 
-    # Create directory structure
-    workspace_path.mkdir(parents=True)
-    (workspace_path / "project").mkdir()
-    (workspace_path / "context").mkdir()
-    (workspace_path / "state").mkdir()
-    (workspace_path / "logs").mkdir()
+    created_at = _create_subdirs(workspace_path, WORKSPACE_SUBDIRS)
 
-    logger.info("workspace_created", workspace_id=workspace_id, path=str(workspace_path))
+    if log_enabled_for(logging.INFO):
+        logger.info("workspace_created", workspace_id=workspace_id, path=str(workspace_path))
 
-    return WorkspaceInfo.from_path(workspace_path)
+    return WorkspaceInfo.from_path(workspace_path, created_at=created_at)
+
+
+def _create_subdirs(workspace_path: Path, names: tuple[str, ...]) -> datetime | None:
+    """Create subdirectories of a new workspace.
+
+    Where supported, they are created relative to an open descriptor for the
+    workspace (mkdirat), so its path is only resolved once.
+
+    Args:
+        workspace_path: Existing workspace directory
+        names: Subdirectory names
+
+    Returns:
+        Workspace creation time if it was read along the way, else None
+    """
+    if os.mkdir not in os.supports_dir_fd:
+        for name in names:
+            (workspace_path / name).mkdir()
+        return None
+
+    fd = os.open(workspace_path, _DIR_FD_FLAGS)
+    try:
+        for name in names:
+            os.mkdir(name, dir_fd=fd)
+        return datetime.fromtimestamp(os.fstat(fd).st_ctime)
+    finally:
+        os.close(fd)
 
 
 def get_workspace(workspace_id: str, base_dir: Path = WORKSPACES_BASE) -> WorkspaceInfo:
@@ -88,12 +160,13 @@ def get_workspace(workspace_id: str, base_dir: Path = WORKSPACES_BASE) -> Worksp
     Raises:
         FileNotFoundError: If workspace doesn't exist
     """
-    workspace_path = base_dir / workspace_id
+    workspace_path = Path(_base_prefix(base_dir) + workspace_id)
 
-    if not workspace_path.exists():
-        raise FileNotFoundError(f"Workspace {workspace_id} not found")
-
-    return WorkspaceInfo.from_path(workspace_path)
+    # from_path() stats the workspace anyway, so let that detect a missing one
+    try:
+        return WorkspaceInfo.from_path(workspace_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Workspace {workspace_id} not found") from None
 
 
 def list_workspaces(base_dir: Path = WORKSPACES_BASE) -> list[WorkspaceInfo]:
@@ -103,18 +176,51 @@ def list_workspaces(base_dir: Path = WORKSPACES_BASE) -> list[WorkspaceInfo]:
         base_dir: Base directory for workspaces
 
     Returns:
-        List of WorkspaceInfo, sorted by creation time (newest first)
+        List of WorkspaceInfo, sorted by build number (newest first)
     """
-    if not base_dir.exists():
-        return []
+    return list(iter_workspaces(base_dir))
 
-    workspaces = [
-        WorkspaceInfo.from_path(p)
-        for p in base_dir.iterdir()
-        if p.is_dir() and p.name.isdigit()
-    ]
 
-    return sorted(workspaces, key=lambda w: w.created_at, reverse=True)
+def iter_workspaces(base_dir: Path = WORKSPACES_BASE) -> Iterator[WorkspaceInfo]:
+    """Iterate over existing workspaces, newest first.
+
+    Workspaces are ordered by build number, which needs only the directory
+    listing, and each one is stat'ed only when it is reached. Taking the
+    first item (the latest workspace) costs a single stat.
+
+    Args:
+        base_dir: Base directory for workspaces
+
+    Yields:
+        WorkspaceInfo, sorted by build number (newest first)
+    """
+    try:
+        entries = os.scandir(_base_prefix(base_dir))
+    except FileNotFoundError:
+        return
+
+    # Directory entries carry the name and type, so filtering and ordering
+    # need no stat calls
+    with entries:
+        candidates = [
+            entry for entry in entries
+            if entry.name.isdigit() and entry.is_dir(follow_symlinks=False)
+        ]
+
+    # Numeric order without int(): shorter digit strings are smaller
+    candidates.sort(key=lambda entry: (len(entry.name), entry.name), reverse=True)
+
+    for entry in candidates:
+        yield _workspace_info_from_dirent(entry)
+
+
+def _workspace_info_from_dirent(entry: os.DirEntry) -> WorkspaceInfo:
+    """Build WorkspaceInfo from a scandir entry, reusing its stat result."""
+    st = entry.stat(follow_symlinks=False)
+    return WorkspaceInfo.from_path(
+        Path(entry.path),
+        created_at=datetime.fromtimestamp(st.st_ctime),
+    )
 
 
 def delete_workspace(workspace_id: str, base_dir: Path = WORKSPACES_BASE):
@@ -127,12 +233,15 @@ def delete_workspace(workspace_id: str, base_dir: Path = WORKSPACES_BASE):
     Raises:
         FileNotFoundError: If workspace doesn't exist
     """
-    workspace_path = base_dir / workspace_id
-
-    if not workspace_path.exists():
-        raise FileNotFoundError(f"Workspace {workspace_id} not found")
-
-    shutil.rmtree(workspace_path)
+    workspace_path = _base_prefix(base_dir) + workspace_id
+
+    # Where supported (shutil.rmtree.avoids_symlink_attacks), rmtree already
+    # walks the tree with scandir on directory descriptors and removes
+    # entries with unlinkat(), so no path is resolved more than once
+    try:
+        shutil.rmtree(workspace_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Workspace {workspace_id} not found") from None
     logger.info("workspace_deleted", workspace_id=workspace_id)
 
 
@@ -140,6 +249,7 @@ def copy_file_to_context(
     source_path: Path,
     workspace: WorkspaceInfo,
     dest_name: str | None = None,
+    link_ok: bool = False,
 ) -> Path:
     """Copy a file into the workspace context directory.
 
@@ -147,6 +257,8 @@ def copy_file_to_context(
         source_path: Path to source file
         workspace: Target workspace
         dest_name: Optional destination filename (defaults to source filename)
+        link_ok: Hard-link instead of copying where possible. Only for files
+            nothing will modify: writes through either name change both.
 
     Returns:
         Path to the copied file in the context directory
@@ -157,7 +269,67 @@ def copy_file_to_context(
     dest_name = dest_name or source_path.name
     dest_path = workspace.context_dir / dest_name
 
-    shutil.copy2(source_path, dest_path)
-    logger.debug("file_copied_to_context", source=str(source_path), dest=str(dest_path))
+    if not (link_ok and _link_file(source_path, dest_path)):
+        _copy_file(source_path, dest_path)
 
     return dest_path
+
+
+# link() errors meaning "copy instead" (other filesystem, no hard link
+# support, link limit, or an existing destination to overwrite)
+_LINK_UNSUPPORTED = {errno.EXDEV, errno.EPERM, errno.EMLINK, errno.EOPNOTSUPP, errno.EEXIST}
+
+
+def _link_file(source_path: Path, dest_path: Path) -> bool:
+    """Hard-link dest_path to source_path.
+
+    Returns:
+        True if linked, False if the file must be copied instead
+    """
+    try:
+        os.link(source_path, dest_path)
+    except OSError as e:
+        if e.errno not in _LINK_UNSUPPORTED:
+            raise
+        return False
+    return True
+
+
+# copy_file_range() errors meaning "not possible here", e.g. across filesystems
+_COPY_RANGE_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP}
+
+
+def _copy_file(source_path: Path, dest_path: Path):
+    """Copy a file's contents, permissions and timestamps, like shutil.copy2().
+
+    On Linux the data is copied inside the kernel with copy_file_range(),
+    falling back to shutil.copy2() where that isn't supported.
+    """
+    if not hasattr(os, "copy_file_range"):
+        shutil.copy2(source_path, dest_path)
+        return
+
+    src_fd = os.open(source_path, os.O_RDONLY)
+    try:
+        st = os.fstat(src_fd)
+        if st.st_size == 0:
+            # Empty, or a generated file (procfs, sysfs) that reports no size
+            # but has contents; copy2() reads it up to EOF
+            shutil.copy2(source_path, dest_path)
+            return
+        dst_fd = os.open(dest_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            # Copy until EOF rather than st_size, in case the file has grown
+            while os.copy_file_range(src_fd, dst_fd, st.st_size):
+                pass
+
+            os.fchmod(dst_fd, stat.S_IMODE(st.st_mode))
+            os.utime(dst_fd, ns=(st.st_atime_ns, st.st_mtime_ns))
+        finally:
+            os.close(dst_fd)
+    except OSError as e:
+        if e.errno not in _COPY_RANGE_UNSUPPORTED:
+            raise
+        shutil.copy2(source_path, dest_path)
+    finally:
+        os.close(src_fd)
@@ -0,0 +1,44 @@
+"""Shared pytest fixtures."""
+import os
+
+import pytest
+
+from pipeline.models import WorkspaceInfo
+from pipeline.workspace import WORKSPACE_SUBDIRS
+
+
+def pytest_configure(config):
+    """Keep temporary directories on tmpfs if PIPELINE_TEST_TMPFS is set.
+
+    Tests create many small workspace trees; on tmpfs each mkdir stays in
+    memory. It is opt-in because /dev/shm is often small (64 MB by default
+    in containers). An explicit --basetemp or PYTEST_DEBUG_TEMPROOT still wins.
+    """
+    if not os.environ.get("PIPELINE_TEST_TMPFS"):
+        return
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK | os.X_OK):
+        os.environ.setdefault("PYTEST_DEBUG_TEMPROOT", "/dev/shm")
+
+
+@pytest.fixture(autouse=True)
+def _isolated_workflow_cache(tmp_path_factory, monkeypatch):
+    """Keep parsed-workflow caches out of the user's ~/.cache."""
+    cache_dir = tmp_path_factory.getbasetemp() / "pipeline-cache"
+    monkeypatch.setenv("PIPELINE_CACHE_DIR", str(cache_dir))
+
+
+@pytest.fixture
+def workspace(tmp_path):
+    """Create a temporary workspace."""
+    ws_path = tmp_path / "00001"
+    ws_path.mkdir()
+
+    # Create the subdirectories relative to the workspace (mkdirat)
+    fd = os.open(ws_path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        for name in WORKSPACE_SUBDIRS:
+            os.mkdir(name, dir_fd=fd)
+    finally:
+        os.close(fd)
+
+    return WorkspaceInfo.from_path(ws_path)
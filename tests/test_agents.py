@@ -1,7 +1,12 @@
 """Tests for agent executors."""
+import asyncio
+import time
+
 import pytest
 from pathlib import Path
 
+from pipeline.agents import claude_code
+from pipeline.agents.claude_code import ClaudeCodeExecutor, _read_stream_tail
 from pipeline.agents.mock import MockAgentExecutor
 from pipeline.models import StepDefinition, ModelName
 from pipeline.workspace import create_workspace
@@ -10,22 +15,6 @@ from pipeline.workspace import create_workspace
 class TestMockAgentExecutor:
     """Tests for MockAgentExecutor."""
 
-    @pytest.fixture
-    def workspace(self, tmp_path):
-        """Create a temporary workspace for testing."""
-        from pipeline.models import WorkspaceInfo
-        from datetime import datetime
-
-        # Create workspace structure in tmp directory
-        ws_path = tmp_path / "00001"
-        ws_path.mkdir()
-        (ws_path / "project").mkdir()
-        (ws_path / "context").mkdir()
-        (ws_path / "state").mkdir()
-        (ws_path / "logs").mkdir()
-
-        return WorkspaceInfo.from_path(ws_path)
-
     @pytest.fixture
     def mock_prompt(self, tmp_path):
         """Create a test prompt file."""
@@ -103,6 +92,7 @@ Generate test outputs.
         # Should take at least 2 seconds due to MOCK_SLOW
         assert duration >= 2.0
         assert result.status.value == "completed"  # MOCK_SLOW adds delay but succeeds
+        assert result.duration_seconds >= 2.0
 
     def test_mock_generates_correct_python_content(self, workspace, mock_prompt):
         """Test that mock generates valid Python code."""
@@ -151,3 +141,188 @@ Generate test outputs.
         content = md_file.read_text()
         assert "# Mock Output" in content
         assert "two_sum" in content
+
+    def test_mock_reports_unwritable_outputs(self, workspace, mock_prompt):
+        """Test that outputs that can't be written fail the step."""
+        (workspace.project_dir / "blocker").write_text("a file, not a directory")
+        step = StepDefinition(
+            id="blocked_step",
+            model=ModelName.HAIKU,
+            prompt_strategy=mock_prompt,
+            outputs=["context/output.md", "project/blocker/solution.py"],
+        )
+
+        result = MockAgentExecutor().execute_step(step, workspace)
+
+        assert result.status.value == "failed"
+        assert "project/blocker/solution.py" in result.error
+        assert "context/output.md" not in result.error
+
+    def test_prompt_template_substitution(self, tmp_path):
+        """Test placeholder substitution and template reload on change."""
+        prompt_path = tmp_path / "template.md"
+        prompt_path.write_text("Solve {problem_name} in {workspace}; keep {unknown}")
+
+        executor = MockAgentExecutor()
+        text = executor.load_prompt_template(
+            str(prompt_path), {"problem_name": "two_sum", "workspace": "/ws"}
+        )
+        assert text == "Solve two_sum in /ws; keep {unknown}"
+
+        prompt_path.write_text("Updated prompt for {problem_name}")
+        text = executor.load_prompt_template(str(prompt_path), {"problem_name": "two_sum"})
+        assert text == "Updated prompt for two_sum"
+
+    def test_prompt_template_missing(self, tmp_path):
+        """Test that a missing template raises FileNotFoundError."""
+        executor = MockAgentExecutor()
+
+        with pytest.raises(FileNotFoundError, match="Prompt template not found"):
+            executor.load_prompt_template(str(tmp_path / "missing.md"))
+
+
+class TestClaudeCodeExecutor:
+    """Tests for ClaudeCodeExecutor helpers that don't invoke the CLI."""
+
+    def test_hash_outputs_tracks_rewrites(self, workspace):
+        """Test that output hashes change when a file is rewritten."""
+        step = StepDefinition(
+            id="build",
+            model=ModelName.SONNET,
+            prompt_strategy="prompt.md",
+            outputs=["project/solution.py", "project/missing.py"],
+        )
+        output_file = workspace.workspace_path / "project/solution.py"
+        output_file.write_text("print('v1')\n")
+
+        executor = ClaudeCodeExecutor()
+        first = executor._hash_outputs(step, workspace)
+        assert list(first) == ["project/solution.py"]
+        assert len(first["project/solution.py"]) == 8
+        assert executor._hash_outputs(step, workspace) == first
+
+        output_file.write_text("print('version 2')\n")
+        second = executor._hash_outputs(step, workspace)
+        assert second["project/solution.py"] != first["project/solution.py"]
+
+    def test_build_command_uses_model_alias(self, workspace):
+        """Test that the step's model is passed through as the CLI alias."""
+        step = StepDefinition(
+            id="review",
+            model=ModelName.OPUS,
+            prompt_strategy="prompt.md",
+        )
+
+        cmd = ClaudeCodeExecutor()._build_command(step, workspace, "Do the review")
+
+        assert cmd[cmd.index("--model") + 1] == "opus"
+        assert cmd[cmd.index("-p") + 1] == "Do the review"
+
+    def test_failure_reports_end_of_stderr(self, workspace, tmp_path, monkeypatch):
+        """Test that a failed run's error carries the last of stderr, not the first."""
+        prompt_path = tmp_path / "prompt.md"
+        prompt_path.write_text("Workspace: {workspace}\n")
+        step = StepDefinition(
+            id="build",
+            model=ModelName.SONNET,
+            prompt_strategy=str(prompt_path),
+        )
+        stderr = "warning: noisy preamble\n" * 100 + "Error: the real cause\n"
+
+        async def fake_run_command(cmd, cwd, timeout):
+            return 1, "", stderr, 0
+
+        executor = ClaudeCodeExecutor()
+        monkeypatch.setattr(executor, "_run_command", fake_run_command)
+        result = executor.execute_step(step, workspace)
+
+        assert result.error.startswith("Claude Code exited with code 1: ")
+        assert result.error.endswith("Error: the real cause\n")
+
+    @pytest.mark.parametrize("script", ["sleep 30", "sleep 30 & wait"])
+    def test_timeout_kills_child_processes(self, tmp_path, script):
+        """Test that a timeout returns promptly even if the agent has children."""
+        executor = ClaudeCodeExecutor()
+        started = time.monotonic()
+
+        with pytest.raises(asyncio.TimeoutError):
+            asyncio.run(executor._run_command(["sh", "-c", script], tmp_path, timeout=1))
+
+        assert time.monotonic() - started < 3
+
+    def test_exit_does_not_wait_for_background_children(self, tmp_path):
+        """Test that the run ends when the agent exits, not when its pipes close."""
+        executor = ClaudeCodeExecutor()
+        started = time.monotonic()
+
+        result = asyncio.run(
+            executor._run_command(["sh", "-c", "sleep 30 & echo done"], tmp_path, timeout=10)
+        )
+
+        assert result == (0, "done", "", 0)
+        assert time.monotonic() - started < 3
+
+
+class TestReadStreamTail:
+    """Tests for streaming agent output into a bounded tail."""
+
+    @staticmethod
+    def read_tail(data: bytes, **kwargs) -> tuple[str, int]:
+        async def read():
+            stream = asyncio.StreamReader()
+            stream.feed_data(data)
+            stream.feed_eof()
+            return await _read_stream_tail(stream, **kwargs)
+
+        return asyncio.run(read())
+
+    def test_keeps_last_lines(self):
+        """Test that only the last _OUTPUT_TAIL_LINES lines are kept."""
+        data = b"".join(b"line %d\n" % i for i in range(500))
+
+        tail, _ = self.read_tail(data)
+
+        lines = tail.split("\n")
+        assert len(lines) == claude_code._OUTPUT_TAIL_LINES
+        assert lines[-1] == "line 499"
+
+    def test_caps_total_bytes(self):
+        """Test that long lines are dropped from the front to bound the tail's size."""
+        data = b"".join(b"%04d" % i + b"x" * 1000 + b"\n" for i in range(100))
+
+        tail, _ = self.read_tail(data)
+
+        assert len(tail) <= claude_code._OUTPUT_TAIL_BYTES
+        assert tail.split("\n")[-1].startswith("0099")
+
+    def test_first_token_count_wins(self):
+        """Test that the first token usage line is reported, and only if asked for."""
+        data = b"starting\nused 1234 tokens\nused 99 tokens\n"
+
+        assert self.read_tail(data, scan_tokens=True)[1] == 1234
+        assert self.read_tail(data)[1] == 0
+
+    def test_splits_overlong_lines(self):
+        """Test that a line longer than _MAX_LINE_BYTES is split rather than buffered."""
+        limit = claude_code._MAX_LINE_BYTES
+        data = b"x" * (limit * 2 + 5) + b"\nend\n"
+
+        tail, _ = self.read_tail(data)
+
+        assert tail.split("\n") == ["x" * limit, "x" * limit, "xxxxx", "end"]
+
+        # The same, for a line still unfinished when a read ends
+        async def read_unfinished():
+            stream = asyncio.StreamReader()
+            stream.feed_data(data[: limit * 2 + 5])
+            reader = asyncio.ensure_future(_read_stream_tail(stream))
+            await asyncio.sleep(0)
+            stream.feed_data(data[limit * 2 + 5 :])
+            stream.feed_eof()
+            return await reader
+
+        assert asyncio.run(read_unfinished()) == (tail, 0)
+
+    def test_keeps_final_line_without_newline(self):
+        """Test that unterminated trailing output is not lost."""
+        assert self.read_tail(b"first\nlast") == ("first\nlast", 0)
@@ -0,0 +1,57 @@
+"""Tests for CLI argument handling."""
+import pytest
+
+from pipeline.cli import _COMMANDS, _fast_parse, main
+
+
+class TestFastParse:
+    """Tests for the argparse-free fast path."""
+
+    def test_parse_run_arguments(self):
+        """Test parsing separate and --flag=value forms."""
+        options = _COMMANDS["run"][2]
+
+        args = _fast_parse(["--workflow", "wf.yaml", "--max-workers=3"], options)
+
+        assert args.workflow == "wf.yaml"
+        assert args.problem is None
+        assert args.max_workers == 3
+
+    @pytest.mark.parametrize("argv", [
+        [],
+        ["--help"],
+        ["--workflow"],
+        ["--workflow", "wf.yaml", "--unknown", "x"],
+        ["--workflow", "wf.yaml", "--max-workers", "many"],
+        ["--workflow", "wf.yaml", "--max-workers", "0"],
+        ["--workflow", "a.yaml", "--workflow", "b.yaml"],
+    ])
+    def test_defers_to_argparse(self, argv):
+        """Test that unusual input is left for argparse to report."""
+        assert _fast_parse(argv, _COMMANDS["run"][2]) is None
+
+    def test_missing_required_argument_exits(self, capsys):
+        """Test that argparse still reports missing arguments."""
+        with pytest.raises(SystemExit) as exc_info:
+            main(["status"])
+
+        assert exc_info.value.code == 2
+        assert "--workspace" in capsys.readouterr().err
+
+    def test_max_workers_below_one_rejected(self, tmp_path, monkeypatch, capsys):
+        """Test that --max-workers 0 is a usage error, raised before a workspace exists."""
+        monkeypatch.chdir(tmp_path)
+        workflow = tmp_path / "wf.yaml"
+        workflow.write_text("workflow: {name: wf, steps: []}")
+
+        with pytest.raises(SystemExit) as exc_info:
+            main(["run", "--workflow", str(workflow), "--max-workers", "0"])
+
+        assert exc_info.value.code == 2
+        assert "--max-workers: must be at least 1" in capsys.readouterr().err
+        assert not (tmp_path / "workspaces").exists()
+
+    def test_no_command_prints_help(self, capsys):
+        """Test running without a command."""
+        assert main([]) == 1
+        assert "usage:" in capsys.readouterr().out
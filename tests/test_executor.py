@@ -1,16 +1,49 @@
 """Tests for workflow execution and orchestration."""
+import asyncio
+import errno
+from datetime import datetime
+
 import pytest
 from pathlib import Path
 
-from pipeline.executor import resolve_execution_order, WorkflowExecutor
+from pipeline.agents.base import AsyncAgentExecutor
+from pipeline.executor import (
+    compile_plan,
+    resolve_execution_order,
+    WorkflowExecutor,
+)
 from pipeline.models import (
     WorkflowDefinition,
     StepDefinition,
     ModelName,
+    StepResult,
     StepStatus,
-    WorkspaceInfo,
 )
-from pipeline.state import load_state
+from pipeline.state import load_state, save_state
+
+
+class ConcurrencyProbeExecutor(AsyncAgentExecutor):
+    """Async test executor that records how many steps run at once."""
+
+    def __init__(self, delays=None):
+        super().__init__(name="probe")
+        self.delays = delays or {}
+        self.running = 0
+        self.max_running = 0
+
+    async def aexecute_step(self, step, workspace, context=None):
+        started_at = datetime.now()
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(self.delays.get(step.id, 0.05))
+        self.running -= 1
+
+        return StepResult(
+            step_id=step.id,
+            status=StepStatus.COMPLETED,
+            started_at=started_at,
+            completed_at=datetime.now(),
+        )
 
 
 class TestExecutionOrder:
@@ -131,20 +164,81 @@ class TestExecutionOrder:
             resolve_execution_order(workflow)
 
 
-class TestWorkflowExecutor:
-    """Tests for workflow execution."""
+    def test_order_resolved_at_validation(self):
+        """Test that the order is computed once, when the workflow is built."""
+        workflow = WorkflowDefinition(
+            name="cached",
+            steps=[
+                StepDefinition(
+                    id="b",
+                    model=ModelName.HAIKU,
+                    prompt_strategy="prompt.md",
+                    depends_on=["a"],
+                ),
+                StepDefinition(id="a", model=ModelName.HAIKU, prompt_strategy="prompt.md"),
+            ],
+        )
+        assert workflow._execution_order == ("a", "b")
+
+        first = resolve_execution_order(workflow)
+        first.append("mutated by caller")
+
+        assert resolve_execution_order(workflow) == ["a", "b"]
+        assert compile_plan(workflow).order is workflow._execution_order
+
+    def test_compile_plan(self):
+        """Test that execution plans are shared and read-only."""
+        def make_workflow():
+            return WorkflowDefinition(
+                name="plan",
+                steps=[
+                    StepDefinition(id="a", model=ModelName.HAIKU, prompt_strategy="prompt.md"),
+                    StepDefinition(
+                        id="b",
+                        model=ModelName.HAIKU,
+                        prompt_strategy="prompt.md",
+                        depends_on=["a"],
+                    ),
+                ],
+            )
+
+        plan = compile_plan(make_workflow())
+
+        assert plan.order == ("a", "b")
+        assert plan.positions == {"a": 0, "b": 1}
+        assert plan.dependents_at == ((1,), ())
+        assert plan.dependencies_at == ((), (0,))
+        assert plan.in_degree_at == (0, 1)
+        assert compile_plan(make_workflow()) is plan
+        with pytest.raises(TypeError):
+            plan.positions["b"] = 0
+
+    def test_step_definition_is_frozen(self):
+        """Test that step definitions can't be modified after parsing."""
+        step = StepDefinition(id="a", model=ModelName.HAIKU, prompt_strategy="prompt.md")
+
+        with pytest.raises(ValueError):
+            step.depends_on = ["b"]
+
+    def test_workflow_definition_is_immutable(self):
+        """Test that a workflow's steps can't change after its order is resolved."""
+        step = StepDefinition(id="a", model=ModelName.HAIKU, prompt_strategy="prompt.md")
+        workflow = WorkflowDefinition(name="frozen", steps=[step])
+
+        with pytest.raises(AttributeError):
+            workflow.steps.append(step)
+        with pytest.raises(ValueError):
+            workflow.steps = (step, step)
+        with pytest.raises(AttributeError):
+            step.depends_on.append("b")
+        with pytest.raises(TypeError):
+            workflow.step_map["b"] = step
+
+        assert resolve_execution_order(workflow) == ["a"]
 
-    @pytest.fixture
-    def workspace(self, tmp_path):
-        """Create a temporary workspace."""
-        ws_path = tmp_path / "00001"
-        ws_path.mkdir()
-        (ws_path / "project").mkdir()
-        (ws_path / "context").mkdir()
-        (ws_path / "state").mkdir()
-        (ws_path / "logs").mkdir()
 
-        return WorkspaceInfo.from_path(ws_path)
+class TestWorkflowExecutor:
+    """Tests for workflow execution."""
 
     @pytest.fixture
     def mock_prompt(self, tmp_path):
@@ -247,6 +341,41 @@ class TestWorkflowExecutor:
         assert state.steps["step1"].status == StepStatus.FAILED
         assert state.steps["step2"].status == StepStatus.PENDING  # Never executed due to stop-on-failure
 
+    def test_failure_logged_once_not_per_dependency(self, workspace, tmp_path):
+        """Test that a failed step's dependents don't each log a warning."""
+        from structlog.testing import capture_logs
+
+        fail_prompt = tmp_path / "fail_prompt.md"
+        fail_prompt.write_text("MOCK_FAIL")
+
+        workflow = WorkflowDefinition(
+            name="fan_out_failure",
+            steps=[
+                StepDefinition(
+                    id="root",
+                    model=ModelName.HAIKU,
+                    wrapper="mock",
+                    prompt_strategy=str(fail_prompt),
+                ),
+            ] + [
+                StepDefinition(
+                    id=f"leaf{i}",
+                    model=ModelName.HAIKU,
+                    wrapper="mock",
+                    prompt_strategy=str(fail_prompt),
+                    depends_on=["root"],
+                )
+                for i in range(5)
+            ],
+        )
+
+        with capture_logs() as logs:
+            WorkflowExecutor(max_workers=4).run(workflow, workspace)
+
+        events = [entry["event"] for entry in logs]
+        assert events.count("workflow_stopped_on_failure") == 1
+        assert not [entry for entry in logs if entry.get("step_id", "").startswith("leaf")]
+
     def test_resume_incomplete_workflow(self, workspace, mock_prompt):
         """Test resuming a workflow from saved state."""
         workflow = WorkflowDefinition(
@@ -347,3 +476,246 @@ class TestWorkflowExecutor:
         assert loaded_state is not None
         assert loaded_state.is_complete
         assert loaded_state.steps["step1"].status == StepStatus.COMPLETED
+
+    def test_workflow_path_recorded_in_state(self, workspace, mock_prompt, tmp_path):
+        """Test that the workflow file path is persisted for resume."""
+        workflow_path = tmp_path / "workflow.yaml"
+        workflow_path.write_text("workflow: {}")
+
+        workflow = WorkflowDefinition(
+            name="path_test",
+            steps=[
+                StepDefinition(
+                    id="step1",
+                    model=ModelName.HAIKU,
+                    wrapper="mock",
+                    prompt_strategy=mock_prompt,
+                ),
+            ],
+        )
+
+        executor = WorkflowExecutor()
+        executor.run(workflow, workspace, workflow_path=workflow_path)
+
+        loaded_state = load_state(workspace)
+        assert loaded_state.workflow_path == str(workflow_path.resolve())
+
+    def test_independent_steps_run_concurrently(self, workspace, mock_prompt):
+        """Test that independent steps overlap when max_workers allows it."""
+        workflow = WorkflowDefinition(
+            name="parallel_test",
+            steps=[
+                StepDefinition(
+                    id=f"step{i}",
+                    model=ModelName.HAIKU,
+                    wrapper="probe",
+                    prompt_strategy=mock_prompt,
+                )
+                for i in range(3)
+            ] + [
+                StepDefinition(
+                    id="final",
+                    model=ModelName.HAIKU,
+                    wrapper="probe",
+                    prompt_strategy=mock_prompt,
+                    depends_on=["step0", "step1", "step2"],
+                ),
+            ],
+        )
+
+        probe = ConcurrencyProbeExecutor()
+        executor = WorkflowExecutor(max_workers=2)
+        executor.register_agent("probe", probe)
+        state = executor.run(workflow, workspace)
+
+        assert not state.has_failures
+        assert len(state.completed_steps) == 4
+        assert probe.max_running == 2
+        assert all(
+            state.steps[f"step{i}"].completed_at <= state.steps["final"].started_at
+            for i in range(3)
+        )
+
+    def test_step_starts_when_its_dependencies_finish(self, workspace, mock_prompt):
+        """Test that a step doesn't wait for unrelated slower steps."""
+        workflow = WorkflowDefinition(
+            name="ready_test",
+            steps=[
+                StepDefinition(
+                    id=step_id,
+                    model=ModelName.HAIKU,
+                    wrapper="probe",
+                    prompt_strategy=mock_prompt,
+                    depends_on=depends_on,
+                )
+                for step_id, depends_on in [("slow", []), ("fast", []), ("after_fast", ["fast"])]
+            ],
+        )
+
+        probe = ConcurrencyProbeExecutor(delays={"slow": 0.5, "fast": 0.01, "after_fast": 0.01})
+        executor = WorkflowExecutor(max_workers=2)
+        executor.register_agent("probe", probe)
+        state = executor.run(workflow, workspace)
+
+        assert len(state.completed_steps) == 3
+        assert state.steps["after_fast"].completed_at < state.steps["slow"].completed_at
+
+    def test_resume_reruns_completed_step_with_incomplete_dependency(
+        self, workspace, mock_prompt
+    ):
+        """Test that resume re-runs a completed step whose dependency didn't complete."""
+        workflow = WorkflowDefinition(
+            name="stale_test",
+            steps=[
+                StepDefinition(
+                    id=step_id,
+                    model=ModelName.HAIKU,
+                    wrapper="mock",
+                    prompt_strategy=mock_prompt,
+                    outputs=[f"{step_id}.md"],
+                    depends_on=depends_on,
+                )
+                for step_id, depends_on in [("a", []), ("b", ["a"]), ("c", ["b"])]
+            ],
+        )
+
+        executor = WorkflowExecutor()
+        executor.run(workflow, workspace)
+
+        # Simulate state where "a" didn't complete but later steps did
+        state = load_state(workspace)
+        state.update_step(StepResult(
+            step_id="a",
+            status=StepStatus.FAILED,
+            started_at=datetime.now(),
+            completed_at=datetime.now(),
+            error="boom",
+        ))
+        save_state(state, workspace)
+
+        reruns = []
+        original = executor._execute_step
+
+        async def recording_execute_step(step, *args):
+            reruns.append(step.id)
+            return await original(step, *args)
+
+        executor._execute_step = recording_execute_step
+        state = executor.resume(workflow, workspace)
+
+        assert reruns == ["a", "b", "c"]
+        assert not state.has_failures
+
+    def test_agent_output_stored_outside_state(self, workspace, mock_prompt):
+        """Test that raw agent output goes to the logs dir, not the state file."""
+
+        class ChattyExecutor(AsyncAgentExecutor):
+            async def aexecute_step(self, step, workspace, context=None):
+                return StepResult(
+                    step_id=step.id,
+                    status=StepStatus.COMPLETED,
+                    started_at=datetime.now(),
+                    completed_at=datetime.now(),
+                    agent_output="very long transcript " * 100,
+                )
+
+        workflow = WorkflowDefinition(
+            name="output_test",
+            steps=[
+                StepDefinition(
+                    id="talk",
+                    model=ModelName.HAIKU,
+                    wrapper="chatty",
+                    prompt_strategy=mock_prompt,
+                ),
+            ],
+        )
+
+        executor = WorkflowExecutor()
+        executor.register_agent("chatty", ChattyExecutor(name="chatty"))
+        executor.run(workflow, workspace)
+
+        assert "very long transcript" not in (workspace.state_dir / "workflow_state.json").read_text()
+        assert (workspace.logs_dir / "talk.output.txt").exists()
+
+        result = load_state(workspace).steps["talk"]
+        assert result.agent_output is None
+        assert result.load_agent_output().startswith("very long transcript")
+
+    @pytest.mark.parametrize("flush_interval, expected_saves", [(0, 2 + 5), (10, 2 + 1)])
+    def test_state_saves_are_coalesced(
+        self, workspace, mock_prompt, monkeypatch, flush_interval, expected_saves
+    ):
+        """Test that saves within flush_interval are folded together."""
+        import pipeline.executor
+
+        saves = []
+        real_save_state = pipeline.executor.save_state
+
+        def counting_save_state(state, workspace, **kwargs):
+            saves.append(len(state.completed_steps))
+            real_save_state(state, workspace, **kwargs)
+
+        monkeypatch.setattr(pipeline.executor, "save_state", counting_save_state)
+
+        workflow = WorkflowDefinition(
+            name="coalesce_test",
+            steps=[
+                StepDefinition(
+                    id=f"step{i}",
+                    model=ModelName.HAIKU,
+                    wrapper="probe",
+                    prompt_strategy=mock_prompt,
+                    depends_on=[f"step{i - 1}"] if i else [],
+                )
+                for i in range(5)
+            ],
+        )
+
+        executor = WorkflowExecutor(flush_interval=flush_interval)
+        executor.register_agent("probe", ConcurrencyProbeExecutor(delays=dict.fromkeys(
+            (step.id for step in workflow.steps), 0.001
+        )))
+        executor.run(workflow, workspace)
+
+        # Initial base save and final completion save, plus per-step saves
+        assert len(saves) == expected_saves
+        assert load_state(workspace).completed_steps == [f"step{i}" for i in range(5)]
+
+    def test_failed_scheduled_save_is_raised(self, workspace, mock_prompt, monkeypatch):
+        """Test that an error from a delayed save stops the run instead of being lost."""
+        import pipeline.executor
+
+        real_save_state = pipeline.executor.save_state
+        calls = []
+
+        def failing_save_state(state, workspace, **kwargs):
+            calls.append(state.current_step)
+            # Fail once, in the first save scheduled while steps are running
+            if len(calls) == 2:
+                raise OSError(errno.ENOSPC, "No space left on device")
+            real_save_state(state, workspace, **kwargs)
+
+        monkeypatch.setattr(pipeline.executor, "save_state", failing_save_state)
+
+        workflow = WorkflowDefinition(
+            name="failed_save_test",
+            steps=[
+                StepDefinition(
+                    id=f"step{i}",
+                    model=ModelName.HAIKU,
+                    wrapper="probe",
+                    prompt_strategy=mock_prompt,
+                    depends_on=[f"step{i - 1}"] if i else [],
+                )
+                for i in range(3)
+            ],
+        )
+
+        executor = WorkflowExecutor(flush_interval=0.001)
+        executor.register_agent("probe", ConcurrencyProbeExecutor(delays=dict.fromkeys(
+            (step.id for step in workflow.steps), 0.05
+        )))
+
+        with pytest.raises(OSError, match="No space left on device"):
+            executor.run(workflow, workspace)
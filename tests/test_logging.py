@@ -0,0 +1,57 @@
+"""Tests for logging configuration."""
+import json
+import logging
+
+import pytest
+
+from pipeline import configure_logging, get_logger, log_enabled_for
+from pipeline import workspace
+
+
+class TestConfigureLogging:
+    """Tests for configure_logging and module loggers."""
+
+    @pytest.fixture(autouse=True)
+    def restore_logging(self):
+        """Return to the default console configuration after each test."""
+        yield
+        configure_logging()
+
+    def test_reconfigure_after_logging(self, tmp_path, capsys):
+        """Test that loggers already used pick up a later configuration."""
+        logger = get_logger()
+        logger.info("before_reconfigure")
+        workspace.logger.info("module_before_reconfigure")
+
+        log_path = tmp_path / "workspace.log"
+        configure_logging(str(log_path), level=logging.DEBUG)
+        logger.debug("after_reconfigure", step_id="clarify")
+        workspace.logger.debug("module_after_reconfigure")
+
+        assert log_enabled_for(logging.DEBUG)
+        records = [json.loads(line) for line in log_path.read_text().splitlines()]
+        assert [record["event"] for record in records] == [
+            "after_reconfigure",
+            "module_after_reconfigure",
+        ]
+        assert records[0]["step_id"] == "clarify"
+        assert "after_reconfigure" not in capsys.readouterr().out
+
+    def test_switching_log_files_keeps_earlier_loggers_working(self, tmp_path):
+        """Test that loggers built for a previous log file can still write to it."""
+        first, second = tmp_path / "a.log", tmp_path / "b.log"
+        logger = get_logger()
+
+        configure_logging(str(first))
+        logger.info("first")
+        bound = logger.bind(step_id="clarify")
+
+        configure_logging(str(second))
+        logger.info("second")
+        bound.info("still_first")
+
+        assert [json.loads(line)["event"] for line in first.read_text().splitlines()] == [
+            "first",
+            "still_first",
+        ]
+        assert [json.loads(line)["event"] for line in second.read_text().splitlines()] == ["second"]
@@ -0,0 +1,172 @@
+"""Tests for workflow parsing and validation."""
+import pytest
+
+from pipeline.models import ModelName, StepDefinition, WorkflowDefinition
+from pipeline.parser import detect_cycles, parse_workflow, validate_workflow, _parse_workflow_cached
+
+
+WORKFLOW_YAML = """\
+workflow:
+  name: {name}
+  steps:
+    - id: clarify
+      model: haiku
+      wrapper: mock
+      prompt_strategy: prompts/clarify_problem.md
+      outputs:
+        - context/clarified_problem.md
+    - id: build
+      model: sonnet
+      wrapper: mock
+      prompt_strategy: prompts/build_tdd.md
+      depends_on:
+        - clarify
+"""
+
+
+class TestParseWorkflow:
+    """Tests for parse_workflow and its caches."""
+
+    @pytest.fixture(autouse=True)
+    def cache_dir(self, tmp_path, monkeypatch):
+        """Point the on-disk workflow cache at a temporary directory."""
+        cache_dir = tmp_path / "cache"
+        monkeypatch.setenv("PIPELINE_CACHE_DIR", str(cache_dir))
+        _parse_workflow_cached.cache_clear()
+        return cache_dir / "workflows"
+
+    def test_parse_workflow(self, tmp_path):
+        """Test parsing a workflow file."""
+        yaml_path = tmp_path / "workflow.yaml"
+        yaml_path.write_text(WORKFLOW_YAML.format(name="parse-test"))
+
+        workflow = parse_workflow(yaml_path)
+
+        assert workflow.name == "parse-test"
+        assert [step.id for step in workflow.steps] == ["clarify", "build"]
+        assert workflow.steps[1].depends_on == ("clarify",)
+
+    def test_step_map_cached(self, tmp_path):
+        """Test that the step map is built once per parsed workflow."""
+        yaml_path = tmp_path / "workflow.yaml"
+        yaml_path.write_text(WORKFLOW_YAML.format(name="step-map"))
+
+        workflow = parse_workflow(yaml_path)
+
+        assert workflow.step_map["build"].depends_on == ("clarify",)
+        assert parse_workflow(yaml_path).step_map is workflow.step_map
+
+    def test_parse_workflow_not_found(self, tmp_path):
+        """Test parsing a missing workflow file."""
+        with pytest.raises(FileNotFoundError):
+            parse_workflow(tmp_path / "missing.yaml")
+
+    def test_parse_workflow_invalid_yaml(self, tmp_path):
+        """Test that YAML syntax errors are reported as ValueError."""
+        yaml_path = tmp_path / "workflow.yaml"
+        yaml_path.write_text("workflow:\n  steps: [unclosed\n")
+
+        with pytest.raises(ValueError, match="Invalid YAML syntax"):
+            parse_workflow(yaml_path)
+
+    def test_parse_workflow_uses_disk_cache(self, tmp_path, cache_dir):
+        """Test that a parsed workflow is served from the disk cache."""
+        yaml_path = tmp_path / "workflow.yaml"
+        yaml_path.write_text(WORKFLOW_YAML.format(name="cache-test"))
+
+        first = parse_workflow(yaml_path)
+        assert len(list(cache_dir.glob("*.json"))) == 1
+
+        # A fresh process only has the disk cache
+        _parse_workflow_cached.cache_clear()
+        assert parse_workflow(yaml_path) == first
+
+    def test_parse_workflow_reparses_modified_file(self, tmp_path):
+        """Test that editing the file invalidates the caches."""
+        yaml_path = tmp_path / "workflow.yaml"
+        yaml_path.write_text(WORKFLOW_YAML.format(name="before"))
+        assert parse_workflow(yaml_path).name == "before"
+
+        yaml_path.write_text(WORKFLOW_YAML.format(name="after-edit"))
+        assert parse_workflow(yaml_path).name == "after-edit"
+
+
+def _workflow(edges: dict[str, list[str]]) -> WorkflowDefinition:
+    """Build a workflow from a step -> depends_on mapping."""
+    return WorkflowDefinition(
+        name="cycles",
+        steps=[
+            StepDefinition(
+                id=step_id,
+                model=ModelName.HAIKU,
+                prompt_strategy="prompt.md",
+                depends_on=depends_on,
+            )
+            for step_id, depends_on in edges.items()
+        ],
+    )
+
+
+class TestDetectCycles:
+    """Tests for circular dependency detection."""
+
+    def test_no_cycle(self):
+        """Test that a diamond DAG has no cycle."""
+        workflow = _workflow({"a": [], "b": ["a"], "c": ["a"], "d": ["b", "c"]})
+        assert detect_cycles(workflow) is None
+
+    def test_cycle_is_reported(self):
+        """Test that a cycle is returned as a closed path."""
+        workflow = _workflow({"start": [], "a": ["c", "start"], "b": ["a"], "c": ["b"], "after": ["a"]})
+
+        cycle = detect_cycles(workflow)
+
+        assert cycle[0] == cycle[-1]
+        assert sorted(cycle[:-1]) == ["a", "b", "c"]
+
+    def test_self_dependency(self):
+        """Test that a step depending on itself is a cycle."""
+        assert detect_cycles(_workflow({"a": ["a"]})) == ["a", "a"]
+
+    def test_long_chain_does_not_recurse(self):
+        """Test a chain deeper than the recursion limit."""
+        n = 5000
+        edges = {f"s{i}": [f"s{i - 1}"] if i else [] for i in range(n)}
+        assert detect_cycles(_workflow(edges)) is None
+
+        edges["s0"] = [f"s{n - 1}"]
+        assert len(detect_cycles(_workflow(edges))) == n + 1
+
+
+class TestValidateWorkflow:
+    """Tests for workflow validation."""
+
+    def test_missing_prompt_files_reported(self, tmp_path):
+        """Test that only steps with missing prompts are reported."""
+        prompts = tmp_path / "prompts"
+        prompts.mkdir()
+        (prompts / "present.md").write_text("Prompt")
+
+        workflow = WorkflowDefinition(
+            name="validate",
+            steps=[
+                StepDefinition(
+                    id=step_id,
+                    model=ModelName.HAIKU,
+                    prompt_strategy=str(prompt),
+                )
+                for step_id, prompt in [
+                    ("ok", prompts / "present.md"),
+                    ("also_ok", prompts / "present.md"),
+                    ("missing", prompts / "absent.md"),
+                    ("no_dir", tmp_path / "nowhere" / "prompt.md"),
+                ]
+            ],
+        )
+
+        valid, errors = validate_workflow(workflow)
+
+        assert not valid
+        assert len(errors) == 2
+        assert "'missing'" in errors[0]
+        assert "'no_dir'" in errors[1]
@@ -1,26 +1,25 @@
 """Tests for state persistence."""
+import os
+
 import pytest
 from datetime import datetime
 
-from pipeline.state import save_state, load_state, can_resume, get_state_summary
-from pipeline.models import WorkflowState, StepResult, StepStatus, WorkspaceInfo
+from pipeline.state import (
+    save_state,
+    load_state,
+    can_resume,
+    create_backup,
+    get_state_summary,
+    COMPRESSED_STATE_FILENAME,
+    STATE_FILENAME,
+    DELTAS_FILENAME,
+)
+from pipeline.models import WorkflowState, StepResult, StepStatus
 
 
 class TestStatePersistence:
     """Tests for workflow state persistence."""
 
-    @pytest.fixture
-    def workspace(self, tmp_path):
-        """Create a temporary workspace."""
-        ws_path = tmp_path / "00001"
-        ws_path.mkdir()
-        (ws_path / "project").mkdir()
-        (ws_path / "context").mkdir()
-        (ws_path / "state").mkdir()
-        (ws_path / "logs").mkdir()
-
-        return WorkspaceInfo.from_path(ws_path)
-
     @pytest.fixture
     def sample_state(self, workspace):
         """Create a sample workflow state."""
@@ -41,6 +40,18 @@ class TestStatePersistence:
         assert loaded.workflow_id == sample_state.workflow_id
         assert loaded.workflow_name == sample_state.workflow_name
 
+    def test_state_file_compact_by_default(self, workspace, sample_state):
+        """Test that the state file is compact unless an indent is requested."""
+        state_path = workspace.state_dir / STATE_FILENAME
+
+        save_state(sample_state, workspace)
+        assert "\n" not in state_path.read_text()
+
+        sample_state.completed_at = datetime.now()
+        save_state(sample_state, workspace, indent=2)
+        assert state_path.read_text().startswith('{\n  "workflow_id"')
+        assert load_state(workspace).is_complete
+
     def test_load_nonexistent_state(self, workspace):
         """Test loading state when file doesn't exist."""
         loaded = load_state(workspace)
@@ -93,6 +104,176 @@ class TestStatePersistence:
         assert loaded.current_step == "step2"
         assert loaded.total_tokens == 150
 
+    def test_step_updates_append_deltas(self, workspace, sample_state):
+        """Test that saves after the first append deltas instead of rewriting."""
+        save_state(sample_state, workspace)
+        base = (workspace.state_dir / STATE_FILENAME).read_text()
+
+        for i in range(3):
+            sample_state.update_step(StepResult(
+                step_id=f"step{i}",
+                status=StepStatus.COMPLETED,
+                started_at=datetime.now(),
+                completed_at=datetime.now(),
+                tokens_used=10,
+            ))
+            save_state(sample_state, workspace)
+
+        deltas = (workspace.state_dir / DELTAS_FILENAME).read_text().splitlines()
+        assert len(deltas) == 3
+        assert (workspace.state_dir / STATE_FILENAME).read_text() == base
+
+        loaded = load_state(workspace)
+        assert loaded.completed_steps == ["step0", "step1", "step2"]
+        assert loaded.total_tokens == 30
+
+    def test_torn_delta_is_ignored(self, workspace, sample_state):
+        """Test that a partially written final delta doesn't break loading."""
+        save_state(sample_state, workspace)
+        sample_state.update_step(StepResult(
+            step_id="step1",
+            status=StepStatus.COMPLETED,
+            started_at=datetime.now(),
+            completed_at=datetime.now(),
+        ))
+        save_state(sample_state, workspace)
+
+        with open(workspace.state_dir / DELTAS_FILENAME, "a") as f:
+            f.write('{"current_step": null, "steps": {"ste')
+
+        loaded = load_state(workspace)
+        assert loaded.completed_steps == ["step1"]
+
+        # The next save starts a fresh base instead of appending to the tear
+        save_state(loaded, workspace)
+        assert not (workspace.state_dir / DELTAS_FILENAME).exists()
+        assert load_state(workspace).completed_steps == ["step1"]
+
+    def test_completion_compacts_deltas(self, workspace, sample_state):
+        """Test that completing the workflow folds deltas into the base."""
+        save_state(sample_state, workspace)
+        sample_state.update_step(StepResult(
+            step_id="step1",
+            status=StepStatus.COMPLETED,
+            started_at=datetime.now(),
+            completed_at=datetime.now(),
+        ))
+        save_state(sample_state, workspace)
+        assert (workspace.state_dir / DELTAS_FILENAME).exists()
+
+        sample_state.completed_at = datetime.now()
+        save_state(sample_state, workspace)
+
+        assert not (workspace.state_dir / DELTAS_FILENAME).exists()
+        loaded = load_state(workspace)
+        assert loaded.is_complete
+        assert loaded.completed_steps == ["step1"]
+
+    def test_backup_includes_deltas(self, workspace, sample_state):
+        """Test that a backup is a single file including appended deltas."""
+        save_state(sample_state, workspace)
+        sample_state.update_step(StepResult(
+            step_id="step1",
+            status=StepStatus.COMPLETED,
+            started_at=datetime.now(),
+            completed_at=datetime.now(),
+        ))
+        save_state(sample_state, workspace)
+
+        backup_path = create_backup(workspace)
+
+        restored = WorkflowState.model_validate_json(backup_path.read_text())
+        assert restored.completed_steps == ["step1"]
+
+    def test_pending_step_has_no_start_time(self, workspace, sample_state):
+        """Test that pending steps round-trip without a start time."""
+        sample_state.update_step(StepResult(step_id="later", status=StepStatus.PENDING))
+        save_state(sample_state, workspace)
+
+        result = load_state(workspace).steps["later"]
+        assert result.started_at is None
+        assert result.duration_seconds is None
+
+    def test_output_paths_interned(self, workspace, sample_state):
+        """Test that output paths shared by several steps are one string."""
+        for step_id in ("build", "test"):
+            sample_state.update_step(StepResult(
+                step_id=step_id,
+                status=StepStatus.COMPLETED,
+                outputs={"".join(["project/", "build.log"]): step_id},
+            ))
+        save_state(sample_state, workspace)
+
+        for state in (sample_state, load_state(workspace)):
+            build_key, = state.steps["build"].outputs
+            test_key, = state.steps["test"].outputs
+            assert build_key is test_key
+
+    def test_large_state_compressed(self, workspace, sample_state, monkeypatch):
+        """Test that states above the threshold are zstd-compressed."""
+        pytest.importorskip("zstandard")
+        import pipeline.state
+
+        save_state(sample_state, workspace)
+        assert (workspace.state_dir / STATE_FILENAME).exists()
+
+        # Once the state crosses the threshold, the next base replaces the
+        # plain file with a compressed one
+        monkeypatch.setattr(pipeline.state, "COMPRESS_THRESHOLD", 1)
+        sample_state._delta_count = pipeline.state.COMPACT_EVERY
+        save_state(sample_state, workspace)
+
+        compressed = workspace.state_dir / COMPRESSED_STATE_FILENAME
+        assert compressed.read_bytes()[:4] == b"\x28\xb5\x2f\xfd"
+        assert not (workspace.state_dir / STATE_FILENAME).exists()
+        assert load_state(workspace).workflow_id == sample_state.workflow_id
+
+    def test_compressed_state_without_zstandard(self, workspace, monkeypatch):
+        """Test that a compressed state gives a clear error without zstandard."""
+        import pipeline.state
+
+        monkeypatch.setattr(pipeline.state, "zstandard", None)
+        (workspace.state_dir / COMPRESSED_STATE_FILENAME).write_bytes(b"\x28\xb5\x2f\xfd" + b"\0" * 8)
+
+        with pytest.raises(ValueError, match="zstandard is not installed"):
+            load_state(workspace)
+
+    def test_corrupt_compressed_state(self, workspace):
+        """Test that a damaged compressed state is reported as a ValueError."""
+        pytest.importorskip("zstandard")
+
+        (workspace.state_dir / COMPRESSED_STATE_FILENAME).write_bytes(b"\x28\xb5\x2f\xfd" + b"\xff" * 8)
+
+        with pytest.raises(ValueError, match="corrupt zstd-compressed state"):
+            load_state(workspace)
+
+    def test_newer_base_wins(self, workspace, sample_state):
+        """Test that if both base files exist, the most recently written is loaded."""
+        save_state(sample_state, workspace)
+        plain = workspace.state_dir / STATE_FILENAME
+        # A plain JSON body under the compressed name still loads (by magic bytes)
+        newer = workspace.state_dir / COMPRESSED_STATE_FILENAME
+        newer.write_text(plain.read_text().replace(sample_state.workflow_name, "newer"))
+        os.utime(plain, ns=(1_000_000_000, 1_000_000_000))
+
+        assert load_state(workspace).workflow_name == "newer"
+
+    @pytest.mark.parametrize("durable, expected_fsyncs", [(False, 0), (True, 3 + 1)])
+    def test_durable_saves_fsync(self, workspace, sample_state, monkeypatch, durable, expected_fsyncs):
+        """Test that only durable saves fsync (base file + directory twice, then delta)."""
+        import os
+
+        fsyncs = []
+        real_fsync = os.fsync
+        monkeypatch.setattr(os, "fsync", lambda fd: (fsyncs.append(fd), real_fsync(fd)))
+
+        save_state(sample_state, workspace, durable=durable)
+        sample_state.update_step(StepResult(step_id="step1", status=StepStatus.PENDING))
+        save_state(sample_state, workspace, durable=durable)
+
+        assert len(fsyncs) == expected_fsyncs
+        assert "step1" in load_state(workspace).steps
+
     def test_get_state_summary(self, sample_state):
         """Test state summary generation."""
         summary = get_state_summary(sample_state)
@@ -1,15 +1,21 @@
 """Tests for workspace management."""
+import errno
+import os
+
 import pytest
 from pathlib import Path
 
 from pipeline.workspace import (
+    copy_file_to_context,
     create_workspace,
     get_next_build_number,
     get_workspace,
+    iter_workspaces,
     list_workspaces,
     delete_workspace,
     WORKSPACES_BASE,
 )
+from pipeline.models import WorkspaceInfo
 
 
 class TestWorkspaceManagement:
@@ -32,6 +38,27 @@ class TestWorkspaceManagement:
 
         assert get_next_build_number(temp_base) == 3
 
+    def test_get_next_build_number_ignores_other_entries(self, temp_base):
+        """Test that files and non-numeric directories don't count."""
+        temp_base.mkdir()
+        (temp_base / "00002").mkdir()
+        (temp_base / "00007").write_text("not a directory")
+        (temp_base / "latest").mkdir()
+
+        assert get_next_build_number(temp_base) == 3
+
+    def test_get_next_build_number_checks_only_the_highest(self, temp_base, monkeypatch):
+        """Test that only the highest-numbered entry's type is checked."""
+        for build_number in range(1, 21):
+            create_workspace(build_number=build_number, base_dir=temp_base)
+
+        lstat_calls = []
+        real_lstat = os.lstat
+        monkeypatch.setattr(os, "lstat", lambda path: lstat_calls.append(path) or real_lstat(path))
+
+        assert get_next_build_number(temp_base) == 21
+        assert len(lstat_calls) == 1
+
     def test_create_workspace(self, temp_base):
         """Test workspace creation."""
         ws = create_workspace(base_dir=temp_base)
@@ -43,6 +70,15 @@ class TestWorkspaceManagement:
         assert ws.state_dir.exists()
         assert ws.logs_dir.exists()
 
+    def test_create_workspace_without_dir_fd(self, temp_base, monkeypatch):
+        """Test workspace creation on platforms without mkdirat."""
+        monkeypatch.setattr("os.supports_dir_fd", set())
+
+        ws = create_workspace(base_dir=temp_base)
+
+        assert ws.logs_dir.is_dir()
+        assert ws.created_at == get_workspace(ws.workspace_id, base_dir=temp_base).created_at
+
     def test_create_workspace_auto_increment(self, temp_base):
         """Test workspace IDs auto-increment."""
         ws1 = create_workspace(base_dir=temp_base)
@@ -66,6 +102,17 @@ class TestWorkspaceManagement:
         assert ws_retrieved.workspace_id == ws_created.workspace_id
         assert ws_retrieved.workspace_path == ws_created.workspace_path
 
+    def test_workspace_subdirs_built_on_access(self, temp_base):
+        """Test that subdirectory paths are derived lazily and then reused."""
+        ws = get_workspace(create_workspace(base_dir=temp_base).workspace_id, base_dir=temp_base)
+
+        assert "state_dir" not in vars(ws)
+        assert ws.state_dir == ws.workspace_path / "state"
+        assert ws.state_dir is ws.state_dir
+
+        with pytest.raises(AttributeError):
+            ws.workspace_id = "00002"
+
     def test_get_workspace_not_found(self, temp_base):
         """Test retrieving non-existent workspace."""
         with pytest.raises(FileNotFoundError):
@@ -79,10 +126,27 @@ class TestWorkspaceManagement:
         workspaces = list_workspaces(base_dir=temp_base)
 
         assert len(workspaces) == 2
-        # Should be sorted by creation time (newest first)
+        # Should be sorted by build number (newest first)
         assert workspaces[0].workspace_id == "00002"
         assert workspaces[1].workspace_id == "00001"
 
+    def test_iter_workspaces_is_lazy(self, temp_base, monkeypatch):
+        """Test that only the workspaces consumed are stat'ed."""
+        for build_number in (9, 10, 100000):
+            create_workspace(build_number=build_number, base_dir=temp_base)
+
+        stat_calls = []
+        monkeypatch.setattr(
+            "pipeline.workspace._workspace_info_from_dirent",
+            lambda entry: stat_calls.append(entry.name) or WorkspaceInfo.from_path(Path(entry.path)),
+        )
+
+        latest = next(iter_workspaces(temp_base))
+
+        assert latest.workspace_id == "100000"
+        assert stat_calls == ["100000"]
+        assert [w.workspace_id for w in iter_workspaces(temp_base)] == ["100000", "00010", "00009"]
+
     def test_list_workspaces_empty(self, temp_base):
         """Test listing with no workspaces."""
         workspaces = list_workspaces(base_dir=temp_base)
@@ -100,3 +164,87 @@ class TestWorkspaceManagement:
         """Test deleting non-existent workspace."""
         with pytest.raises(FileNotFoundError):
             delete_workspace("99999", base_dir=temp_base)
+
+    def test_list_workspaces_ignores_other_entries(self, temp_base):
+        """Test that only numbered workspace directories are listed."""
+        ws = create_workspace(base_dir=temp_base)
+        (temp_base / "notes").mkdir()
+        (temp_base / "00099").write_text("not a directory")
+
+        workspaces = list_workspaces(base_dir=temp_base)
+
+        assert [w.workspace_id for w in workspaces] == [ws.workspace_id]
+        assert workspaces[0].created_at == get_workspace(ws.workspace_id, base_dir=temp_base).created_at
+
+    def test_list_workspaces_reuses_directory_entry_stat(self, temp_base, monkeypatch):
+        """Test that listing doesn't stat workspace paths again."""
+        create_workspace(base_dir=temp_base)
+        create_workspace(base_dir=temp_base)
+
+        def no_stat(self, *args, **kwargs):
+            raise AssertionError(f"unexpected stat of {self}")
+
+        monkeypatch.setattr(Path, "stat", no_stat)
+
+        assert len(list_workspaces(base_dir=temp_base)) == 2
+
+    def test_copy_file_to_context(self, temp_base, tmp_path):
+        """Test that copied files keep their content, mode and mtime."""
+        ws = create_workspace(base_dir=temp_base)
+        source = tmp_path / "problem.txt"
+        source.write_text("Reverse a string\n" * 1000)
+        source.chmod(0o640)
+        os.utime(source, ns=(1_000_000_000, 2_000_000_000))
+
+        dest = copy_file_to_context(source, ws)
+
+        assert dest == ws.context_dir / "problem.txt"
+        assert dest.read_text() == source.read_text()
+        assert dest.stat().st_mode == source.stat().st_mode
+        assert dest.stat().st_mtime_ns == 2_000_000_000
+
+    def test_copy_file_to_context_falls_back(self, temp_base, tmp_path, monkeypatch):
+        """Test copying when copy_file_range is unsupported (e.g. across filesystems)."""
+        ws = create_workspace(base_dir=temp_base)
+        source = tmp_path / "problem.txt"
+        source.write_text("Reverse a string")
+
+        def cross_device(*args):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+        monkeypatch.setattr(os, "copy_file_range", cross_device, raising=False)
+
+        dest = copy_file_to_context(source, ws, dest_name="renamed.txt")
+
+        assert dest.read_text() == "Reverse a string"
+
+    @pytest.mark.skipif(not os.path.isfile("/proc/version"), reason="needs procfs")
+    def test_copy_file_to_context_reads_sizeless_files(self, temp_base):
+        """Test copying a generated file that reports a size of 0."""
+        ws = create_workspace(base_dir=temp_base)
+        source = Path("/proc/version")
+        assert source.stat().st_size == 0
+
+        dest = copy_file_to_context(source, ws)
+
+        assert dest.read_text() == source.read_text() != ""
+
+    def test_copy_file_to_context_links_when_allowed(self, temp_base, tmp_path, monkeypatch):
+        """Test that link_ok hard-links on the same filesystem and copies otherwise."""
+        ws = create_workspace(base_dir=temp_base)
+        source = tmp_path / "problem.txt"
+        source.write_text("Reverse a string")
+
+        linked = copy_file_to_context(source, ws, link_ok=True)
+        assert linked.stat().st_ino == source.stat().st_ino
+
+        assert copy_file_to_context(source, ws, dest_name="copy.txt").stat().st_ino != source.stat().st_ino
+
+        def cross_device(*args):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+        monkeypatch.setattr(os, "link", cross_device)
+        fallback = copy_file_to_context(source, ws, dest_name="other.txt", link_ok=True)
+
+        assert fallback.read_text() == "Reverse a string"
+        assert fallback.stat().st_ino != source.stat().st_ino